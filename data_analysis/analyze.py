@@ -9,24 +9,63 @@ import json
 import os
 import re
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
+from operator import itemgetter
 from pathlib import Path
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional — the stdlib parses the same bytes
+    _loads = json.loads
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# Character classes instead of lazy ".*?" keep each match attempt linear;
+# like "." they stop at a newline
+_LINK_RE = re.compile(r"\[[^\]\n]*\]\([^)\n]*\)")
+
 
 def load_directory_data():
     """Load employee directory from JSON"""
-    with open("../data/raw/structured/directory.json") as f:
-        return json.load(f)
+    with open("../data/raw/structured/directory.json", "rb") as f:
+        return _loads(f.read())
 
 
 def load_kpi_catalog():
     """Load KPI catalog from CSV"""
-    kpis = []
-    with open("../data/raw/structured/kpi_catalog.csv") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            kpis.append(row)
-    return kpis
+    with open("../data/raw/structured/kpi_catalog.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def analyze_document(entry):
+    """Extract metadata from one markdown document"""
+    with open(entry.path) as f:
+        content = f.read()
+
+    # Extract metadata (only the first 10 lines are split out)
+    head = content.split("\n", 10)[:10]
+    title = head[0].replace("#", "").strip()
+
+    # Find last updated date
+    last_updated = None
+    for line in head:
+        if "last updated" in line.lower():
+            date_match = _DATE_RE.search(line)
+            if date_match:
+                last_updated = date_match.group(0)
+            break
+
+    return {
+        "filename": entry.name,
+        "title": title,
+        "last_updated": last_updated,
+        "word_count": len(content.split()),
+        "line_count": content.count("\n") + 1,
+        "has_links": "](" in content and _LINK_RE.search(content) is not None,
+        "has_code_blocks": "```" in content,
+    }
 
 
 def analyze_documents():
@@ -34,38 +73,24 @@ def analyze_documents():
     docs_path = Path("../data/raw/documents")
     docs_analysis = {"domain": [], "policies": [], "runbooks": []}
 
-    for category in docs_analysis.keys():
+    # List every document first (same files as glob("*.md"), without a Path
+    # per entry), then read them on a thread pool so the file reads overlap
+    doc_files = []
+    for category in docs_analysis:
         category_path = docs_path / category
         if category_path.exists():
-            for doc_file in category_path.glob("*.md"):
-                with open(doc_file) as f:
-                    content = f.read()
-
-                # Extract metadata
-                lines = content.split("\n")
-                title = lines[0].replace("#", "").strip() if lines else doc_file.stem
-
-                # Find last updated date
-                last_updated = None
-                for line in lines[:10]:  # Check first 10 lines
-                    if "last updated" in line.lower():
-                        date_match = re.search(r"\d{4}-\d{2}-\d{2}", line)
-                        if date_match:
-                            last_updated = date_match.group(0)
-                        break
-
-                docs_analysis[category].append(
-                    {
-                        "filename": doc_file.name,
-                        "title": title,
-                        "last_updated": last_updated,
-                        "word_count": len(content.split()),
-                        "line_count": len(lines),
-                        "has_links": bool(re.search(r"\[.*?\]\(.*?\)", content)),
-                        "has_code_blocks": "```" in content,
-                    }
+            with os.scandir(category_path) as entries:
+                doc_files.extend(
+                    (category, entry)
+                    for entry in entries
+                    if entry.name.endswith(".md") and not entry.name.startswith(".")
                 )
 
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(analyze_document, [entry for _, entry in doc_files])
+        for (category, _), doc in zip(doc_files, results, strict=True):
+            docs_analysis[category].append(doc)
+
     return docs_analysis
 
 
@@ -101,13 +126,11 @@ def analyze_kpis(kpi_data):
         "by_owner": defaultdict(list),
         "by_source": defaultdict(list),
         "update_recency": [],
-        "data_sources": set(),
     }
 
     for kpi in kpi_data:
         analysis["by_owner"][kpi["owner_team"]].append(kpi["kpi_name"])
         analysis["by_source"][kpi["primary_source"]].append(kpi["kpi_name"])
-        analysis["data_sources"].add(kpi["primary_source"])
 
         if kpi["last_updated"]:
             analysis["update_recency"].append(
@@ -121,17 +144,17 @@ def analyze_kpis(kpi_data):
     # Convert defaultdicts to regular dicts
     analysis["by_owner"] = dict(analysis["by_owner"])
     analysis["by_source"] = dict(analysis["by_source"])
-    analysis["data_sources"] = sorted(analysis["data_sources"])
-    analysis["update_recency"].sort(key=lambda x: x["last_updated"], reverse=True)
+    analysis["data_sources"] = sorted(analysis["by_source"])  # the distinct sources
+    analysis["update_recency"].sort(key=itemgetter("last_updated"), reverse=True)
 
     return analysis
 
 
-def generate_overview_report(directory_data, kpi_data, docs_analysis):
+def generate_overview_report(directory_data, kpi_data, docs_analysis, generated_at):
     """Generate overview report"""
     report = []
     report.append("# Northwind Commerce Knowledge Base - Overview Analysis")
-    report.append(f"\nGenerated: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    report.append(f"\nGenerated: {generated_at}\n")
 
     report.append("## Dataset Summary\n")
     report.append(f"- **Total Employees:** {len(directory_data)}")
@@ -155,11 +178,11 @@ def generate_overview_report(directory_data, kpi_data, docs_analysis):
     return "\n".join(report)
 
 
-def generate_team_analysis(team_data):
+def generate_team_analysis(team_data, generated_at):
     """Generate team and ownership analysis"""
     report = []
     report.append("# Team and Ownership Analysis\n")
-    report.append(f"Generated: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    report.append(f"Generated: {generated_at}\n")
 
     report.append("## Team Composition\n")
     report.append("| Team | Size | Members |")
@@ -193,11 +216,11 @@ def generate_team_analysis(team_data):
     return "\n".join(report)
 
 
-def generate_kpi_analysis(kpi_analysis):
+def generate_kpi_analysis(kpi_analysis, generated_at):
     """Generate KPI analysis report"""
     report = []
     report.append("# KPI Analysis Report\n")
-    report.append(f"Generated: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    report.append(f"Generated: {generated_at}\n")
 
     report.append("## Overview\n")
     report.append(f"- **Total KPIs:** {kpi_analysis['total_kpis']}")
@@ -225,35 +248,30 @@ def generate_kpi_analysis(kpi_analysis):
     report.append("## Update Recency\n")
     report.append("| KPI | Last Updated | Owner |")
     report.append("|-----|--------------|-------|")
-    for item in kpi_analysis["update_recency"]:
-        report.append(f"| {item['kpi']} | {item['last_updated']} | {item['owner']} |")
+    report.extend(
+        f"| {item['kpi']} | {item['last_updated']} | {item['owner']} |"
+        for item in kpi_analysis["update_recency"]
+    )
     report.append("")
 
     return "\n".join(report)
 
 
-def generate_document_metadata_analysis(docs_analysis):
+def generate_document_metadata_analysis(all_docs, generated_at):
     """Generate document metadata analysis"""
     report = []
     report.append("# Document Metadata Analysis\n")
-    report.append(f"Generated: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-    all_docs = []
-    for category, docs in docs_analysis.items():
-        for doc in docs:
-            doc["category"] = category
-            all_docs.append(doc)
+    report.append(f"Generated: {generated_at}\n")
 
     report.append("## All Documents by Update Date\n")
     report.append("| Document | Category | Last Updated | Size |")
     report.append("|----------|----------|--------------|------|")
 
-    # Sort by last_updated (most recent first)
-    sorted_docs = sorted(all_docs, key=lambda x: x["last_updated"] or "1900-01-01", reverse=True)
-    for doc in sorted_docs:
-        report.append(
-            f"| {doc['title']} | {doc['category']} | {doc['last_updated'] or 'Unknown'} | {doc['word_count']} words |"
-        )
+    # all_docs is already sorted by last_updated (most recent first)
+    report.extend(
+        f"| {doc['title']} | {doc['category']} | {doc['last_updated'] or 'Unknown'} | {doc['word_count']} words |"
+        for doc in all_docs
+    )
     report.append("")
 
     report.append("## Document Statistics\n")
@@ -271,11 +289,11 @@ def generate_document_metadata_analysis(docs_analysis):
     return "\n".join(report)
 
 
-def generate_policy_compliance_report(docs_analysis, kpi_data):
+def generate_policy_compliance_report(docs_analysis, all_docs, kpi_data, generated_at):
     """Generate policy and compliance observations"""
     report = []
     report.append("# Policy and Compliance Analysis\n")
-    report.append(f"Generated: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    report.append(f"Generated: {generated_at}\n")
 
     report.append("## Policy Documents\n")
     for doc in docs_analysis["policies"]:
@@ -293,7 +311,7 @@ def generate_policy_compliance_report(docs_analysis, kpi_data):
 
     for kpi in kpi_data:
         if kpi["last_updated"]:
-            update_date = dt.strptime(kpi["last_updated"], "%Y-%m-%d")
+            update_date = dt.fromisoformat(kpi["last_updated"])
             days_old = (current_date - update_date).days
 
             if days_old > 60:
@@ -303,26 +321,26 @@ def generate_policy_compliance_report(docs_analysis, kpi_data):
 
     if old_kpis:
         report.append(f"### KPIs Not Updated in 60+ Days ({len(old_kpis)})")
-        for kpi_name, last_updated, days in sorted(old_kpis, key=lambda x: x[2], reverse=True):
-            report.append(f"- **{kpi_name}** - Last updated {last_updated} ({days} days ago)")
+        report.extend(
+            f"- **{kpi_name}** - Last updated {last_updated} ({days} days ago)"
+            for kpi_name, last_updated, days in sorted(old_kpis, key=lambda x: x[2], reverse=True)
+        )
         report.append("")
 
     if recent_kpis:
         report.append(f"### Recently Updated KPIs (<30 days) ({len(recent_kpis)})")
-        for kpi_name, last_updated, days in sorted(recent_kpis, key=lambda x: x[2]):
-            report.append(f"- **{kpi_name}** - Last updated {last_updated} ({days} days ago)")
+        report.extend(
+            f"- **{kpi_name}** - Last updated {last_updated} ({days} days ago)"
+            for kpi_name, last_updated, days in sorted(recent_kpis, key=lambda x: x[2])
+        )
         report.append("")
 
     # Check document dates
-    all_docs = []
-    for _category, docs in docs_analysis.items():
-        all_docs.extend(docs)
-
     old_docs = []
     for doc in all_docs:
         if doc["last_updated"]:
             try:
-                update_date = dt.strptime(doc["last_updated"], "%Y-%m-%d")
+                update_date = dt.fromisoformat(doc["last_updated"])
                 days_old = (current_date - update_date).days
                 if days_old > 60:
                     old_docs.append((doc["title"], doc["last_updated"], days_old))
@@ -331,8 +349,10 @@ def generate_policy_compliance_report(docs_analysis, kpi_data):
 
     if old_docs:
         report.append(f"### Documents Not Updated in 60+ Days ({len(old_docs)})")
-        for title, last_updated, days in sorted(old_docs, key=lambda x: x[2], reverse=True):
-            report.append(f"- **{title}** - Last updated {last_updated} ({days} days ago)")
+        report.extend(
+            f"- **{title}** - Last updated {last_updated} ({days} days ago)"
+            for title, last_updated, days in sorted(old_docs, key=lambda x: x[2], reverse=True)
+        )
         report.append("")
 
     report.append("## Recommendations\n")
@@ -344,22 +364,20 @@ def generate_policy_compliance_report(docs_analysis, kpi_data):
     return "\n".join(report)
 
 
-def generate_data_quality_report(directory_data, kpi_data, docs_analysis):
+def generate_data_quality_report(directory_data, kpi_data, all_docs, generated_at):
     """Generate data quality observations"""
     report = []
     report.append("# Data Quality Report\n")
-    report.append(f"Generated: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    report.append(f"Generated: {generated_at}\n")
 
     report.append("## Completeness Check\n")
 
     # Check directory data
     report.append("### Employee Directory")
     complete_fields = ["name", "email", "team", "role", "timezone"]
-    missing_data = defaultdict(int)
-    for person in directory_data:
-        for field in complete_fields:
-            if not person.get(field):
-                missing_data[field] += 1
+    missing_data = Counter(
+        field for person in directory_data for field in complete_fields if not person.get(field)
+    )
 
     if missing_data:
         report.append("**Issues found:**")
@@ -372,11 +390,7 @@ def generate_data_quality_report(directory_data, kpi_data, docs_analysis):
     # Check KPI data
     report.append("### KPI Catalog")
     kpi_fields = ["kpi_name", "definition", "owner_team", "primary_source", "last_updated"]
-    kpi_missing = defaultdict(int)
-    for kpi in kpi_data:
-        for field in kpi_fields:
-            if not kpi.get(field):
-                kpi_missing[field] += 1
+    kpi_missing = Counter(field for kpi in kpi_data for field in kpi_fields if not kpi.get(field))
 
     if kpi_missing:
         report.append("**Issues found:**")
@@ -388,10 +402,6 @@ def generate_data_quality_report(directory_data, kpi_data, docs_analysis):
 
     # Check documents
     report.append("### Documents")
-    all_docs = []
-    for _category, docs in docs_analysis.items():
-        all_docs.extend(docs)
-
     docs_missing_date = sum(1 for doc in all_docs if not doc["last_updated"])
     report.append(f"- {docs_missing_date}/{len(all_docs)} documents missing 'Last updated' date")
     report.append("")
@@ -423,6 +433,14 @@ def generate_data_quality_report(directory_data, kpi_data, docs_analysis):
     return "\n".join(report)
 
 
+def write_report(filename, content):
+    """Write one report to outputs/ as UTF-8 and return its path"""
+    output_path = f"outputs/{filename}"
+    with open(output_path, "wb") as f:
+        f.write(content.encode())
+    return output_path
+
+
 def main():
     """Main analysis function"""
     print("Loading data...")
@@ -430,6 +448,11 @@ def main():
     kpi_data = load_kpi_catalog()
     docs_analysis = analyze_documents()
 
+    # Flattened and sorted once for the reports that look across categories;
+    # the copies carry their category without touching docs_analysis
+    all_docs = [dict(doc, category=cat) for cat, docs in docs_analysis.items() for doc in docs]
+    all_docs.sort(key=lambda doc: doc["last_updated"] or "1900-01-01", reverse=True)
+
     print("Analyzing teams and ownership...")
     team_data = analyze_teams_and_ownership(directory_data, kpi_data)
 
@@ -441,21 +464,27 @@ def main():
     # Create output directory
     os.makedirs("outputs", exist_ok=True)
 
-    # Generate all reports
+    # Generate all reports (with one shared generation timestamp)
+    generated_at = dt.now().strftime("%Y-%m-%d %H:%M:%S")
     reports = {
-        "overview.md": generate_overview_report(directory_data, kpi_data, docs_analysis),
-        "team_analysis.md": generate_team_analysis(team_data),
-        "kpi_analysis.md": generate_kpi_analysis(kpi_analysis),
-        "document_metadata.md": generate_document_metadata_analysis(docs_analysis),
-        "policy_compliance.md": generate_policy_compliance_report(docs_analysis, kpi_data),
-        "data_quality.md": generate_data_quality_report(directory_data, kpi_data, docs_analysis),
+        "overview.md": generate_overview_report(
+            directory_data, kpi_data, docs_analysis, generated_at
+        ),
+        "team_analysis.md": generate_team_analysis(team_data, generated_at),
+        "kpi_analysis.md": generate_kpi_analysis(kpi_analysis, generated_at),
+        "document_metadata.md": generate_document_metadata_analysis(all_docs, generated_at),
+        "policy_compliance.md": generate_policy_compliance_report(
+            docs_analysis, all_docs, kpi_data, generated_at
+        ),
+        "data_quality.md": generate_data_quality_report(
+            directory_data, kpi_data, all_docs, generated_at
+        ),
     }
 
-    for filename, content in reports.items():
-        output_path = f"outputs/{filename}"
-        with open(output_path, "w") as f:
-            f.write(content)
-        print(f"  ✓ Generated {output_path}")
+    # The reports are independent files, so they are written concurrently
+    with ThreadPoolExecutor(max_workers=len(reports)) as executor:
+        for output_path in executor.map(write_report, reports.keys(), reports.values()):
+            print(f"  ✓ Generated {output_path}")
 
     print(f"\n✓ Analysis complete! {len(reports)} reports saved to data_analysis/outputs/")
 
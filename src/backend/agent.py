@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
 from dataclasses import dataclass
 
-from openai import AsyncAzureOpenAI
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
@@ -14,9 +16,9 @@ from services.retrieval_service import RetrievalService
 from services.sql_service import TABLE_SCHEMAS, SQLService
 
 
-@dataclass
+@dataclass(frozen=True)
 class AgentDeps:
-    """Dependencies injected into every agent tool call."""
+    """Dependencies injected into every agent tool call (shared across turns)."""
 
     retrieval_service: RetrievalService
     sql_service: SQLService
@@ -87,6 +89,103 @@ sufficient results. Try different queries or categories.
 )
 
 
+# ---------------------------------------------------------------------------
+# Chat model (shared by both agents)
+# ---------------------------------------------------------------------------
+
+
+_model_lock = threading.Lock()
+_shared_model: tuple[tuple[str, ...], OpenAIChatModel] | None = None
+_retired_models: list[OpenAIChatModel] = []  # replaced while no event loop was running
+_closing: set[asyncio.Task] = set()
+
+
+def _chat_model(s: Settings) -> OpenAIChatModel:
+    """Return the chat model for *s*, reusing one client per Azure configuration.
+
+    Keyed on the connection fields (Settings itself is unhashable) so the
+    main agent and the title agent share one client and its connection pool.
+    Only one configuration is kept; a model built for a different
+    configuration replaces the shared one and the old client is closed.
+    """
+    global _shared_model
+    key = (
+        s.azure_openai_api_key,
+        s.azure_openai_endpoint,
+        s.azure_openai_api_version,
+        s.azure_openai_chat_deployment,
+    )
+    with _model_lock:
+        if _shared_model is not None and _shared_model[0] == key:
+            return _shared_model[1]
+        replaced = _shared_model[1] if _shared_model is not None else None
+        model = _build_chat_model(*key)
+        _shared_model = (key, model)
+    if replaced is not None:
+        _retire_chat_model(replaced)
+    return model
+
+
+def _build_chat_model(
+    api_key: str, endpoint: str, api_version: str, deployment: str
+) -> OpenAIChatModel:
+    """Build an AsyncAzureOpenAI-backed chat model."""
+    client = AsyncAzureOpenAI(
+        api_key=api_key,
+        azure_endpoint=endpoint,
+        api_version=api_version,
+        http_client=_http_client(),
+    )
+    return OpenAIChatModel(deployment, provider=OpenAIProvider(openai_client=client))
+
+
+def _retire_chat_model(model: OpenAIChatModel) -> None:
+    """Close a replaced model's client now, or on the next close_chat_model()."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        with _model_lock:
+            _retired_models.append(model)
+        return
+    task = loop.create_task(model.client.close())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def _http_client() -> DefaultAsyncHttpxClient:
+    """HTTP client for chat completions — HTTP/2 when the optional ``h2`` package is installed.
+
+    HTTP/2 multiplexes concurrent completions (parallel users, tool-driven
+    follow-up calls) over a single TLS connection instead of opening one
+    connection per in-flight request.
+    """
+    try:
+        import h2  # noqa: F401
+
+        return DefaultAsyncHttpxClient(http2=True)
+    except ImportError:
+        return DefaultAsyncHttpxClient()
+
+
+async def close_chat_model() -> None:
+    """Close the shared chat client's connection pool (call on shutdown).
+
+    Closes the exact instances handed to the agents — including any replaced
+    ones still pending — and never builds a client just to close it.
+    """
+    global _shared_model
+    with _model_lock:
+        models = list(_retired_models)
+        if _shared_model is not None:
+            models.append(_shared_model[1])
+        _shared_model = None
+        _retired_models.clear()
+    for model in models:
+        await model.client.close()
+    if _closing:
+        await asyncio.gather(*_closing, return_exceptions=True)
+
+
 # ---------------------------------------------------------------------------
 # Agent factory
 # ---------------------------------------------------------------------------
@@ -107,16 +206,7 @@ def create_agent(
 
     otel_settings = get_instrumentation_settings(s) if instrument else None
 
-    client = AsyncAzureOpenAI(
-        api_key=s.azure_openai_api_key,
-        azure_endpoint=s.azure_openai_endpoint,
-        api_version=s.azure_openai_api_version,
-    )
-
-    model = OpenAIChatModel(
-        s.azure_openai_chat_deployment,
-        provider=OpenAIProvider(openai_client=client),
-    )
+    model = _chat_model(s)
 
     agent = Agent(
         model=model,
@@ -131,7 +221,7 @@ def create_agent(
     # ------------------------------------------------------------------
 
     @agent.tool
-    def search_knowledge_base(
+    async def search_knowledge_base(
         ctx: RunContext[AgentDeps],
         query: str,
         category: str | None = None,
@@ -147,7 +237,7 @@ def create_agent(
             category: Optional filter — one of 'domain', 'policies', 'runbooks',
                       or None to search all categories.
         """
-        results = ctx.deps.retrieval_service.search(
+        results = await ctx.deps.retrieval_service.search(
             query=query,
             category=category,
             vector_limit=s.vector_search_limit,
@@ -159,18 +249,16 @@ def create_agent(
         if not results:
             return "No relevant documents found in the knowledge base for this query."
 
-        formatted_parts: list[str] = []
-        for i, r in enumerate(results, 1):
-            formatted_parts.append(
-                f"[Result {i}]\n"
-                f"Document: {r.document_name}\n"
-                f"Category: {r.category}\n"
-                f"Section: {r.section_header or 'N/A'}\n"
-                f"Last Updated: {r.last_updated or 'Unknown'}\n"
-                f"Relevance Score: {r.score:.4f}\n"
-                f"Content:\n{r.generation_chunk}\n"
-            )
-        return "\n---\n".join(formatted_parts)
+        return "\n---\n".join(
+            f"[Result {i}]\n"
+            f"Document: {r.document_name}\n"
+            f"Category: {r.category}\n"
+            f"Section: {r.section_header or 'N/A'}\n"
+            f"Last Updated: {r.last_updated or 'Unknown'}\n"
+            f"Relevance Score: {r.score:.4f}\n"
+            f"Content:\n{r.generation_chunk}\n"
+            for i, r in enumerate(results, 1)
+        )
 
     # ------------------------------------------------------------------
     # Tool 2: Structured Data Lookup (SQL)
@@ -219,16 +307,7 @@ def create_title_agent(
 
     otel_settings = get_instrumentation_settings(s) if instrument else None
 
-    client = AsyncAzureOpenAI(
-        api_key=s.azure_openai_api_key,
-        azure_endpoint=s.azure_openai_endpoint,
-        api_version=s.azure_openai_api_version,
-    )
-
-    model = OpenAIChatModel(
-        s.azure_openai_chat_deployment,
-        provider=OpenAIProvider(openai_client=client),
-    )
+    model = _chat_model(s)
 
     return Agent(
         model=model,
@@ -36,6 +36,9 @@ class Settings(BaseSettings):
     azure_openai_embedding_deployment: str = "text-embedding-3-small"
     azure_openai_embedding_api_key: str | None = None
     embedding_dimensions: int = 1536
+    embedding_cache_size: int = 1024  # query embeddings kept in memory (0 = off)
+    embedding_batch_size: int = 16  # max queries coalesced into one embeddings call
+    embedding_batch_delay_ms: int = 10  # how long a batch waits for more queries
 
     # ------------------------------------------------------------------
     # Retrieval
@@ -54,11 +57,38 @@ class Settings(BaseSettings):
     reranker_model: str = "rerank-v3.5"
     reranker_top_n: int = 5
 
+    # ------------------------------------------------------------------
+    # Semantic answer cache (optional — disabled by default)
+    # Standalone questions within the similarity threshold of a cached
+    # one are answered from the cache without calling the LLM.
+    # ------------------------------------------------------------------
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl_seconds: int = 3600
+    semantic_cache_max_entries: int = 1000
+
     # ------------------------------------------------------------------
     # Database
     # ------------------------------------------------------------------
     db_path: Path = _PROJECT_ROOT / "database" / "knowledge_assistant.sqlite"
     chat_db_path: Path = _PROJECT_ROOT / "database" / "chat_history.sqlite"
+    db_pool_size: int = 8  # read connections to the knowledge database (per service)
+    chat_history_cache_size: int = 1024  # chats whose messages are kept in memory
+    sql_max_rows: int = 200  # rows returned to the agent per structured-data query
+    sql_cache_size: int = 64  # structured-data query results kept in memory (0 = off)
+
+    # ------------------------------------------------------------------
+    # CORS — browser origins allowed to call the API directly (the bundled
+    # frontends go through a same-origin proxy).  Empty disables CORS.
+    # ------------------------------------------------------------------
+    cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
+
+    # ------------------------------------------------------------------
+    # Concurrency — threads for blocking work offloaded from the event loop
+    # ------------------------------------------------------------------
+    worker_threads: int = 40
+    # Server processes for `python main.py`; 1 keeps the auto-reloading dev server
+    web_concurrency: int = 1
 
     # ------------------------------------------------------------------
     # Auth (JWT) — set AUTH_ENABLED=false to disable for development
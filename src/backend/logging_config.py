@@ -13,6 +13,8 @@ import sys
 
 from loguru import logger
 
+_LOGGING_FILE = logging.__file__
+
 
 class InterceptHandler(logging.Handler):
     """Redirect stdlib logging records to loguru."""
@@ -23,8 +25,10 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
-        frame, depth = logging.currentframe(), 2
-        while frame and frame.f_code.co_filename == logging.__file__:
+        # Start at emit()'s caller and skip the stdlib logging frames so loguru
+        # reports the module that actually logged.
+        frame, depth = sys._getframe(1), 1
+        while frame and frame.f_code.co_filename == _LOGGING_FILE:
             frame = frame.f_back  # type: ignore[assignment]
             depth += 1
 
@@ -64,6 +68,8 @@ def setup_logging(*, level: str = "INFO", json: bool = False) -> None:
         stdlib_logger.handlers = [intercept]
         stdlib_logger.propagate = False
 
-    # Also intercept the root logger as a catch-all
+    # Also intercept the root logger as a catch-all.  Its level mirrors the
+    # loguru level (the numbers line up) so records loguru would drop are
+    # filtered by stdlib before a LogRecord is built or the handler runs.
     logging.root.handlers = [intercept]
-    logging.root.setLevel(logging.DEBUG)
+    logging.root.setLevel(logger.level(level).no)
@@ -7,16 +7,24 @@ any HTTP framework.
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from typing import Any, TypeVar
 
-from fastapi import Depends, FastAPI, HTTPException
+import anyio.to_thread
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from loguru import logger
 from openai import AzureOpenAI
+from pydantic import TypeAdapter
 
-from agent import create_agent, create_title_agent
+from agent import close_chat_model, create_agent, create_title_agent
 from auth import AuthenticatedUser, create_token, get_current_user
 from config import get_settings
 from logging_config import setup_logging
@@ -30,8 +38,9 @@ from models import (
     LoginResponse,
     MessageResponse,
 )
-from services.chat_history_service import ChatHistoryService
+from services.chat_history_service import Chat, ChatHistoryService, Message
 from services.retrieval_service import RetrievalService
+from services.semantic_cache_service import SemanticCacheService
 from services.sql_service import SQLService
 from telemetry import is_observability_active, setup_telemetry
 from use_cases.chat import ChatResult, ChatUseCase, generate_chat_title
@@ -40,6 +49,8 @@ from use_cases.exceptions import EmptyConversationError
 # Configure loguru before anything else
 setup_logging()
 
+T = TypeVar("T")
+
 
 # ---------------------------------------------------------------------------
 # Lifespan: initialise shared resources once at startup
@@ -52,6 +63,14 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     settings.validate_runtime()
 
+    # Size the pools behind asyncio.to_thread (retrieval, embeddings) and
+    # FastAPI's sync dependencies, so blocking work offloaded from the event
+    # loop is not capped by the CPU-count-based defaults.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.worker_threads, thread_name_prefix="worker")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.worker_threads
+
     # Embedding client (sync) — used by the retrieval service
     embedding_client = AzureOpenAI(
         api_key=settings.azure_openai_embedding_api_key,
@@ -68,14 +87,36 @@ async def lifespan(app: FastAPI):
         reranker_api_key=settings.reranker_api_key,
         reranker_model=settings.reranker_model,
         reranker_top_n=settings.reranker_top_n,
+        embedding_cache_size=settings.embedding_cache_size,
+        embedding_batch_size=settings.embedding_batch_size,
+        embedding_batch_delay_ms=settings.embedding_batch_delay_ms,
+        pool_size=settings.db_pool_size,
     )
     retrieval.connect()
+    retrieval.start_embedding_batcher()
 
-    sql = SQLService(db_path=settings.db_path)
+    sql = SQLService(
+        db_path=settings.db_path,
+        max_rows=settings.sql_max_rows,
+        pool_size=settings.db_pool_size,
+        result_cache_size=settings.sql_cache_size,
+    )
     sql.connect()
 
+    response_cache: SemanticCacheService | None = None
+    if settings.semantic_cache_enabled:
+        response_cache = SemanticCacheService(
+            embedding_dimensions=settings.embedding_dimensions,
+            similarity_threshold=settings.semantic_cache_threshold,
+            ttl_seconds=settings.semantic_cache_ttl_seconds,
+            max_entries=settings.semantic_cache_max_entries,
+        )
+        response_cache.connect()
+
     # Chat history (separate DB — auto-creates schema)
-    history = ChatHistoryService(db_path=settings.chat_db_path)
+    history = ChatHistoryService(
+        db_path=settings.chat_db_path, message_cache_size=settings.chat_history_cache_size
+    )
     history.connect()
 
     # Seed pre-registered users (used when open_registration is disabled)
@@ -96,16 +137,28 @@ async def lifespan(app: FastAPI):
         agent=agent,
         retrieval_service=retrieval,
         sql_service=sql,
+        response_cache=response_cache,
     )
     app.state.history = history
+    # The history service shares one SQLite connection, so its calls run on a
+    # single dedicated thread — serialized as before, but off the event loop.
+    # Being FIFO, it also orders write-behind saves ahead of later reads.
+    app.state.history_executor = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="chat-history"
+    )
     app.state.title_agent = title_agent
 
     logger.info("Application startup complete")
     yield
 
+    app.state.history_executor.shutdown(wait=True)  # flushes pending writes
     history.close()
+    await retrieval.stop_embedding_batcher()
     retrieval.close()
     sql.close()
+    if response_cache:
+        response_cache.close()
+    await close_chat_model()
     logger.info("Application shutdown complete")
 
 
@@ -120,26 +173,119 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Explicit origins/methods/headers: no wildcard handling per request, and no
+# middleware at all when CORS_ORIGINS is empty.  Requests without an Origin
+# header (health checks, the proxied frontends' GETs) pass straight through.
+if get_settings().cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=get_settings().cors_origins,
+        allow_methods=["GET", "POST"],
+        allow_headers=["authorization", "content-type"],
+    )
 
 # Instrument FastAPI with observability (no-op when OBSERVABILITY=off)
 setup_telemetry(app, get_settings())
 
 
 # ---------------------------------------------------------------------------
-# Helper: build ChatMessage list from persisted history
+# Helpers: chat history access off the event loop
 # ---------------------------------------------------------------------------
 
 
+async def _run_history(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking ChatHistoryService call on the history thread."""
+    return await asyncio.get_running_loop().run_in_executor(
+        app.state.history_executor, functools.partial(fn, *args, **kwargs)
+    )
+
+
+async def _write_behind(fn: Callable[..., Any], *args, **kwargs) -> None:
+    """Queue a history write on the history thread without waiting for it.
+
+    Keeps SQLite inserts and commits off the response path.  Reads of the
+    same data queue behind the write, so they still see it — but only within
+    this process.  With several server workers the next request may land on
+    another worker, so the write is awaited instead.
+    """
+    if app.state.settings.web_concurrency > 1:
+        await _run_history(fn, *args, **kwargs)
+        return
+    future = app.state.history_executor.submit(fn, *args, **kwargs)
+    future.add_done_callback(_log_write_failure)
+
+
+def _log_write_failure(future: Future) -> None:
+    if not future.cancelled() and (exc := future.exception()):
+        logger.opt(exception=exc).error("Chat history write failed")
+
+
+_HISTORY = TypeAdapter(list[ChatMessage])
+
+
 def _load_history_as_messages(history: ChatHistoryService, chat_id: str) -> list[ChatMessage]:
     """Load all messages from the history DB and convert to ChatMessage list."""
     stored = history.get_chat_messages(chat_id)
-    return [ChatMessage(role=m.role, content=m.content) for m in stored]
+    return _HISTORY.validate_python(stored, from_attributes=True)
+
+
+def _open_turn(
+    history: ChatHistoryService, chat_id: str | None, user_id: str
+) -> tuple[Chat, list[ChatMessage]]:
+    """Ensure the chat exists and load its history."""
+    chat_obj = history.get_or_create_chat(chat_id, user_id)
+    return chat_obj, _load_history_as_messages(history, chat_obj.id)
+
+
+async def _start_turn(
+    history: ChatHistoryService, chat_id: str | None, user_id: str, message: str
+) -> tuple[Chat, list[ChatMessage]]:
+    """Open the chat, then persist the user message in the background.
+
+    Returns the chat and its history including the new message.
+    """
+    chat_obj, messages = await _run_history(_open_turn, history, chat_id, user_id)
+    await _write_behind(history.save_user_message, chat_obj.id, message)
+    return chat_obj, [*messages, ChatMessage(role="user", content=message)]
+
+
+# ---------------------------------------------------------------------------
+# Helper: Vercel AI Data Stream Protocol lines
+# ---------------------------------------------------------------------------
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:  # optional speed-up — same compact UTF-8 output from stdlib json
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stream_line(code: str, payload: Any) -> str:
+    """Encode one ``<code>:<json>\\n`` line of the data stream protocol."""
+    return f"{code}:{_dumps(payload)}\n"
+
+
+# ---------------------------------------------------------------------------
+# Helper: pre-serialized JSON responses
+# ---------------------------------------------------------------------------
+# Routes keep ``response_model`` for the OpenAPI schema but return a Response
+# directly, so FastAPI does not dump, re-validate and re-serialize the models.
+
+_CHAT_SUMMARIES = TypeAdapter(list[ChatSummaryResponse])
+
+# Stored ``Message`` rows are dumped as-is (no per-message model to build or
+# validate); dropping ``chat_id`` gives exactly the MessageResponse shape.
+_MESSAGES = TypeAdapter(list[Message])
+_MESSAGE_EXCLUDE = {"__all__": {"chat_id"}}
+
+
+def _json_response(body: bytes | str) -> Response:
+    return Response(content=body, media_type="application/json")
 
 
 # ---------------------------------------------------------------------------
@@ -167,9 +313,9 @@ async def login(request: LoginRequest):
     hist: ChatHistoryService = app.state.history
 
     if settings.open_registration:
-        user = hist.ensure_user_by_email(request.name, request.email)
+        user = await _run_history(hist.ensure_user_by_email, request.name, request.email)
     else:
-        user = hist.get_user_by_email(request.email)
+        user = await _run_history(hist.get_user_by_email, request.email)
         if not user:
             raise HTTPException(
                 status_code=401,
@@ -197,14 +343,10 @@ async def chat(
     hist: ChatHistoryService = app.state.history
     uc: ChatUseCase = app.state.chat_uc
 
-    # 1) Ensure chat exists
-    chat_obj = hist.get_or_create_chat(request.chat_id, current_user.user_id)
-
-    # 2) Persist user message
-    hist.save_user_message(chat_obj.id, request.message)
-
-    # 3) Load full history for the agent
-    messages = _load_history_as_messages(hist, chat_obj.id)
+    # 1-3) Ensure chat exists, load history, persist user message (write-behind)
+    chat_obj, messages = await _start_turn(
+        hist, request.chat_id, current_user.user_id, request.message
+    )
 
     logger.info(
         "POST /chat | user={} chat={} msg={}",
@@ -215,26 +357,31 @@ async def chat(
 
     # 4) Execute use case
     try:
-        result: ChatResult = await uc.execute(messages)
+        result: ChatResult = await uc.execute(messages, use_cache=not request.no_cache)
     except EmptyConversationError as exc:
         raise HTTPException(status_code=422, detail=str(exc))
 
-    # 5) Persist assistant message
-    msg_id = hist.save_assistant_message(
+    # 5) Persist assistant message (write-behind — the ID is assigned here)
+    msg_id = str(uuid.uuid4())
+    await _write_behind(
+        hist.save_assistant_message,
         chat_id=chat_obj.id,
         content=result.answer,
         tool_calls=result.tool_calls,
         sources=result.sources,
         model=result.model,
         latency_ms=result.latency_ms,
+        message_id=msg_id,
     )
 
-    return ChatResponse(
-        chat_id=chat_obj.id,
-        message_id=msg_id,
-        answer=result.answer,
-        tool_calls=result.tool_calls,
-        sources=result.sources,
+    return _json_response(
+        ChatResponse(
+            chat_id=chat_obj.id,
+            message_id=msg_id,
+            answer=result.answer,
+            tool_calls=result.tool_calls,
+            sources=result.sources,
+        ).model_dump_json()
     )
 
 
@@ -256,9 +403,9 @@ async def chat_stream(
     hist: ChatHistoryService = app.state.history
     uc: ChatUseCase = app.state.chat_uc
 
-    chat_obj = hist.get_or_create_chat(request.chat_id, current_user.user_id)
-    hist.save_user_message(chat_obj.id, request.message)
-    messages = _load_history_as_messages(hist, chat_obj.id)
+    chat_obj, messages = await _start_turn(
+        hist, request.chat_id, current_user.user_id, request.message
+    )
 
     logger.info(
         "POST /chat/stream | user={} chat={} msg={}",
@@ -269,23 +416,37 @@ async def chat_stream(
 
     async def event_generator():
         final_result: ChatResult | None = None
+        streamed: list[str] = []
+        tail = ""
 
-        async for chunk in uc.execute_stream(messages):
+        async for chunk in uc.execute_stream(messages, use_cache=not request.no_cache):
             if isinstance(chunk, ChatResult):
                 final_result = chunk
             else:
-                # Vercel protocol: text token
-                yield f"0:{json.dumps(chunk)}\n"
+                # Vercel protocol: text chunk (deltas arrive pre-grouped by the
+                # agent stream's debounce window, so each is one ASGI send)
+                streamed.append(chunk)
+                yield _stream_line("0", chunk)
 
         if final_result:
-            # Persist assistant message
-            msg_id = hist.save_assistant_message(
+            # Send whatever of the final answer the client has not seen yet.
+            # An answer produced without streaming (e.g. the content-filter
+            # refusal, even after partial text) goes out whole with the tail.
+            answer, sent = final_result.answer, "".join(streamed)
+            if answer != sent:
+                rest = answer[len(sent) :] if answer.startswith(sent) else answer
+                tail = _stream_line("0", rest)
+            # Persist assistant message (write-behind — the ID is assigned here)
+            msg_id = str(uuid.uuid4())
+            await _write_behind(
+                hist.save_assistant_message,
                 chat_id=chat_obj.id,
                 content=final_result.answer,
                 tool_calls=final_result.tool_calls,
                 sources=final_result.sources,
                 model=final_result.model,
                 latency_ms=final_result.latency_ms,
+                message_id=msg_id,
             )
 
             # Vercel protocol: data annotation with metadata
@@ -295,10 +456,10 @@ async def chat_stream(
                 "tool_calls": final_result.tool_calls,
                 "sources": final_result.sources,
             }
-            yield f"2:{json.dumps([annotation])}\n"
+            tail += _stream_line("2", [annotation])
 
-        # Vercel protocol: finish signal
-        yield f"d:{json.dumps({'finishReason': 'stop'})}\n"
+        # Vercel protocol: finish signal, sent together with the annotation
+        yield tail + _stream_line("d", {"finishReason": "stop"})
 
     return StreamingResponse(
         event_generator(),
@@ -319,17 +480,8 @@ async def list_chats(
 ):
     """List all chats for the authenticated user, newest first."""
     hist: ChatHistoryService = app.state.history
-    summaries = hist.list_user_chats(current_user.user_id)
-    return [
-        ChatSummaryResponse(
-            id=s.id,
-            title=s.title,
-            created_at=s.created_at,
-            updated_at=s.updated_at,
-            message_count=s.message_count,
-        )
-        for s in summaries
-    ]
+    summaries = await _run_history(hist.list_user_chats, current_user.user_id)
+    return _json_response(_CHAT_SUMMARIES.dump_json(_CHAT_SUMMARIES.validate_python(summaries)))
 
 
 @app.get("/chats/{chat_id}/messages", response_model=list[MessageResponse])
@@ -339,22 +491,10 @@ async def get_chat_messages(
 ):
     """Get all messages in a chat, ordered chronologically."""
     hist: ChatHistoryService = app.state.history
-    messages = hist.get_chat_messages(chat_id)
+    messages = await _run_history(hist.get_chat_messages, chat_id)
     if not messages:
         raise HTTPException(status_code=404, detail="Chat not found or has no messages")
-    return [
-        MessageResponse(
-            id=m.id,
-            role=m.role,
-            content=m.content,
-            tool_calls=m.tool_calls,
-            sources=m.sources,
-            model=m.model,
-            latency_ms=m.latency_ms,
-            created_at=m.created_at,
-        )
-        for m in messages
-    ]
+    return _json_response(_MESSAGES.dump_json(messages, exclude=_MESSAGE_EXCLUDE))
 
 
 # ---- Chat title generation ------------------------------------------------
@@ -372,7 +512,7 @@ async def generate_title(
     """
     hist: ChatHistoryService = app.state.history
 
-    chat = hist.get_chat(chat_id)
+    chat = await _run_history(hist.get_chat, chat_id)
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
 
@@ -381,11 +521,10 @@ async def generate_title(
         return ChatTitleResponse(chat_id=chat_id, title=chat.title)
 
     # Load messages and generate via LLM
-    stored = hist.get_chat_messages(chat_id)
-    messages = [ChatMessage(role=m.role, content=m.content) for m in stored]
+    messages = await _run_history(_load_history_as_messages, hist, chat_id)
 
     title = await generate_chat_title(messages, app.state.title_agent)
-    hist.update_title(chat_id, title, generated=True)
+    await _run_history(hist.update_title, chat_id, title, generated=True)
 
     logger.info("POST /chats/{}/title | user={} title={}", chat_id, current_user.user_id, title)
     return ChatTitleResponse(chat_id=chat_id, title=title)
@@ -398,4 +537,9 @@ async def generate_title(
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    workers = get_settings().web_concurrency
+    if workers > 1:
+        # One event loop per process; in-process caches are per worker
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
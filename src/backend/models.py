@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 # ---------------------------------------------------------------------------
 # Domain model (shared between use-case and presentation layers)
@@ -49,16 +49,24 @@ class ChatRequest(BaseModel):
     ``user_id`` is extracted from the JWT — not sent in the body.
     """
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     chat_id: str | None = Field(
         default=None,
         description="Existing chat ID to continue. None starts a new chat.",
     )
     message: str = Field(description="The new user message")
+    no_cache: bool = Field(
+        default=False,
+        description="Skip the semantic answer cache for this message (neither read nor stored).",
+    )
 
 
 class ChatResponse(BaseModel):
     """Response body from the POST /chat endpoint."""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     chat_id: str = Field(description="The chat ID (new or existing)")
     message_id: str = Field(description="ID of the persisted assistant message")
     answer: str = Field(description="The assistant's response with inline citations")
@@ -78,7 +86,9 @@ class ChatResponse(BaseModel):
 
 
 class ChatSummaryResponse(BaseModel):
-    """A single chat in the listing."""
+    """A single chat in the listing (validated straight from ``ChatSummary`` rows)."""
+
+    model_config = ConfigDict(extra="ignore", frozen=True, from_attributes=True)
 
     id: str
     title: str | None
@@ -88,7 +98,9 @@ class ChatSummaryResponse(BaseModel):
 
 
 class MessageResponse(BaseModel):
-    """A single persisted message."""
+    """A single persisted message — the shape of a ``Message`` row without ``chat_id``."""
+
+    model_config = ConfigDict(extra="ignore", frozen=True, from_attributes=True)
 
     id: str
     role: str
@@ -9,12 +9,34 @@ from __future__ import annotations
 import json
 import sqlite3
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 
 from loguru import logger
 
+# One row per chat: SQLite builds the whole message list as a JSON array
+# (tool_calls/sources embedded as JSON, malformed values as []), so loading
+# a chat is a single json.loads rather than a row fetch plus two decodes
+# per message.  Each entry is ``[created_at, rowid, message]``: an aggregate
+# is not guaranteed to keep a subquery's order (and ``ORDER BY`` inside the
+# aggregate needs SQLite 3.44), so the caller sorts on the first two.
+_SQL_CHAT_MESSAGES = """
+SELECT json_group_array(json_array(created_at, rowid, json_object(
+    'id', id,
+    'chat_id', chat_id,
+    'role', role,
+    'content', content,
+    'tool_calls', CASE WHEN json_valid(tool_calls) THEN json(tool_calls) ELSE json('[]') END,
+    'sources', CASE WHEN json_valid(sources) THEN json(sources) ELSE json('[]') END,
+    'model', model,
+    'latency_ms', latency_ms,
+    'created_at', created_at
+)))
+FROM (SELECT rowid, * FROM messages WHERE chat_id = ? ORDER BY created_at, rowid)
+"""
+
 # ---------------------------------------------------------------------------
 # Data classes returned by the service
 # ---------------------------------------------------------------------------
@@ -110,10 +132,15 @@ def _utcnow() -> str:
 class ChatHistoryService:
     """CRUD operations for chat history stored in a dedicated SQLite file."""
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, message_cache_size: int = 1024) -> None:
         self.db_path = db_path
         self.conn: sqlite3.Connection | None = None
 
+        # LRU of chat_id -> messages (0 disables it), kept current by the save
+        # methods and re-checked against the row count on every read
+        self.message_cache_size = message_cache_size
+        self._message_cache: OrderedDict[str, list[Message]] = OrderedDict()
+
     def connect(self) -> None:
         """Open (or create) the database and ensure the schema exists."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -132,8 +159,14 @@ class ChatHistoryService:
         # Add title_generated column if it doesn't exist yet
         columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(chats)").fetchall()}
         if "title_generated" not in columns:
-            self.conn.execute("ALTER TABLE chats ADD COLUMN title_generated BOOLEAN DEFAULT 0")
-            logger.info("Migrated chats table: added title_generated column")
+            try:
+                self.conn.execute("ALTER TABLE chats ADD COLUMN title_generated BOOLEAN DEFAULT 0")
+            except sqlite3.OperationalError as exc:
+                # Another server worker applied it between the check and the ALTER
+                if "duplicate column" not in str(exc):
+                    raise
+            else:
+                logger.info("Migrated chats table: added title_generated column")
 
     def close(self) -> None:
         if self.conn:
@@ -172,14 +205,12 @@ class ChatHistoryService:
         """
         assert self.conn
         for u in users:
-            existing = self.get_user_by_email(u["email"])
-            if not existing:
-                user_id = str(uuid.uuid4())
-                now = _utcnow()
-                self.conn.execute(
-                    "INSERT INTO users (id, name, email, created_at) VALUES (?, ?, ?, ?)",
-                    (user_id, u["name"], u["email"], now),
-                )
+            # OR IGNORE: another server worker may be seeding the same users
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO users (id, name, email, created_at) VALUES (?, ?, ?, ?)",
+                (str(uuid.uuid4()), u["name"], u["email"], _utcnow()),
+            )
+            if cursor.rowcount:
                 logger.info("Seeded user: {} ({})", u["name"], u["email"])
         self.conn.commit()
 
@@ -300,17 +331,21 @@ class ChatHistoryService:
     # Messages
     # ------------------------------------------------------------------
 
-    def save_user_message(self, chat_id: str, content: str) -> str:
-        """Persist a user message and return its ID."""
+    def save_user_message(self, chat_id: str, content: str, message_id: str | None = None) -> str:
+        """Persist a user message and return its ID (generated unless *message_id* is given)."""
         assert self.conn
-        msg_id = str(uuid.uuid4())
+        msg_id = message_id or str(uuid.uuid4())
+        now = _utcnow()
         self.conn.execute(
             "INSERT INTO messages (id, chat_id, role, content, created_at) VALUES (?, ?, 'user', ?, ?)",
-            (msg_id, chat_id, content, _utcnow()),
+            (msg_id, chat_id, content, now),
         )
         self.conn.commit()
         self._update_chat_title_if_needed(chat_id, content)
         self._touch_chat(chat_id)
+        self._append_cached(
+            Message(id=msg_id, chat_id=chat_id, role="user", content=content, created_at=now)
+        )
         return msg_id
 
     def save_assistant_message(
@@ -321,10 +356,15 @@ class ChatHistoryService:
         sources: list[dict] | None = None,
         model: str | None = None,
         latency_ms: int | None = None,
+        message_id: str | None = None,
     ) -> str:
-        """Persist an assistant message (with optional metadata) and return its ID."""
+        """Persist an assistant message (with optional metadata) and return its ID.
+
+        The ID is generated unless *message_id* is given.
+        """
         assert self.conn
-        msg_id = str(uuid.uuid4())
+        msg_id = message_id or str(uuid.uuid4())
+        now = _utcnow()
         self.conn.execute(
             "INSERT INTO messages (id, chat_id, role, content, tool_calls, sources, model, latency_ms, created_at) "
             "VALUES (?, ?, 'assistant', ?, ?, ?, ?, ?, ?)",
@@ -336,20 +376,58 @@ class ChatHistoryService:
                 json.dumps(sources or []),
                 model,
                 latency_ms,
-                _utcnow(),
+                now,
             ),
         )
         self.conn.commit()
         self._touch_chat(chat_id)
+        self._append_cached(
+            Message(
+                id=msg_id,
+                chat_id=chat_id,
+                role="assistant",
+                content=content,
+                tool_calls=tool_calls or [],
+                sources=sources or [],
+                model=model,
+                latency_ms=latency_ms,
+                created_at=now,
+            )
+        )
         return msg_id
 
     def get_chat_messages(self, chat_id: str) -> list[Message]:
-        """Return all messages in a chat, ordered chronologically."""
+        """Return all messages in a chat, ordered chronologically.
+
+        A cached chat is served from memory when its row count still matches,
+        which skips reading and JSON-decoding every message on each turn.
+        """
         assert self.conn
-        rows = self.conn.execute(
-            "SELECT * FROM messages WHERE chat_id = ? ORDER BY created_at ASC", (chat_id,)
-        ).fetchall()
-        return [self._row_to_message(row) for row in rows]
+        cached = self._message_cache.get(chat_id)
+        if cached is not None:
+            (count,) = self.conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+            if count == len(cached):
+                self._message_cache.move_to_end(chat_id)
+                return list(cached)
+
+        (payload,) = self.conn.execute(_SQL_CHAT_MESSAGES, (chat_id,)).fetchone()
+        rows = json.loads(payload)
+        rows.sort(key=lambda row: (row[0] or "", row[1]))  # created_at, then insertion order
+        messages = [Message(**fields) for _, _, fields in rows]
+        if self.message_cache_size > 0:
+            self._message_cache[chat_id] = messages
+            self._message_cache.move_to_end(chat_id)
+            while len(self._message_cache) > self.message_cache_size:
+                self._message_cache.popitem(last=False)
+        return list(messages)
+
+    def _append_cached(self, message: Message) -> None:
+        """Add a just-saved message to its chat's cached list, if cached."""
+        cached = self._message_cache.get(message.chat_id)
+        if cached is not None:
+            cached.append(message)
 
     # ------------------------------------------------------------------
     # Listing
@@ -395,29 +473,3 @@ class ChatHistoryService:
             created_at=row["created_at"],
             updated_at=row["updated_at"],
         )
-
-    @staticmethod
-    def _row_to_message(row: sqlite3.Row) -> Message:
-        tool_calls = row["tool_calls"] or "[]"
-        sources = row["sources"] or "[]"
-        if isinstance(tool_calls, str):
-            try:
-                tool_calls = json.loads(tool_calls)
-            except (json.JSONDecodeError, TypeError):
-                tool_calls = []
-        if isinstance(sources, str):
-            try:
-                sources = json.loads(sources)
-            except (json.JSONDecodeError, TypeError):
-                sources = []
-        return Message(
-            id=row["id"],
-            chat_id=row["chat_id"],
-            role=row["role"],
-            content=row["content"],
-            tool_calls=tool_calls,
-            sources=sources,
-            model=row["model"],
-            latency_ms=row["latency_ms"],
-            created_at=row["created_at"],
-        )
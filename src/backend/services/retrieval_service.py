@@ -1,7 +1,14 @@
 """Hybrid retrieval service combining vector search and BM25 with RRF reranking."""
 
+import asyncio
+import hashlib
 import json
+import queue
 import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -10,6 +17,194 @@ from loguru import logger
 from openai import AzureOpenAI
 from sqlite_vec import serialize_float32
 
+# Applied to every pooled connection.  The knowledge DB belongs to the data
+# pipeline, so its journal mode is left alone; the 64 MiB page cache and
+# 1 GiB mmap window keep the vec0/FTS5 pages in memory between queries.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=1073741824",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Constant SQL text lets sqlite3's per-connection statement cache reuse the
+# compiled statement; ids are bound as one JSON array rather than a
+# variable-length placeholder list.
+_SQL_DETAILS = """
+SELECT chunk_id, document_name, category, section_header,
+       generation_chunk, last_updated, chunk_metadata
+FROM document_chunks
+WHERE chunk_id IN (SELECT value FROM json_each(?))
+"""
+
+# Upper bound on a rerank call, so a slow reranker cannot stall a search
+# for the SDK's much longer default.
+_RERANKER_TIMEOUT_S = 10.0
+
+# ---------------------------------------------------------------------------
+# Hybrid search SQL
+# ---------------------------------------------------------------------------
+# One statement ranks both legs, fuses them with RRF and joins the chunk
+# details (or, ahead of a rerank, only the text the reranker reads).  SQLite
+# has no FULL OUTER JOIN, so the legs are UNION ALL'd and grouped by
+# chunk_id.  ``ord`` reproduces reciprocal_rank_fusion's tie order (vector
+# hits first, then BM25-only hits, each in rank order).
+#
+# A category filter is pushed into both indexes: vec0 filters on its
+# ``category`` metadata column during the KNN scan, and FTS5 intersects the
+# query with a ``category:`` column filter, so each leg ranks only that
+# category instead of the global top-k.  Indexes built before vec_chunks had
+# the column fall back to filtering through document_chunks.
+
+_VECTOR_RANKED = """
+    vector_ranked AS (
+        SELECT chunk_id, ROW_NUMBER() OVER (ORDER BY distance) AS r
+        FROM (
+            SELECT c.chunk_id, v.distance
+            FROM vec_chunks v
+            JOIN document_chunks c ON v.chunk_id = c.chunk_id
+            WHERE v.embedding MATCH :embedding AND v.k = :vector_limit{category_filter}
+        )
+    )"""
+
+_BM25_RANKED = """
+    bm25_ranked AS (
+        SELECT chunk_id, ROW_NUMBER() OVER (ORDER BY bm25_score) AS r
+        FROM (
+            SELECT chunk_id, {bm25} AS bm25_score
+            FROM fts_chunks
+            WHERE fts_chunks MATCH :query
+            ORDER BY bm25_score
+            LIMIT :bm25_limit
+        )
+    )"""
+
+# Zero weight on the category column (chunk_id, document_name, category,
+# section_header, content) so the added column filter does not add to the
+# score.
+_BM25_CATEGORY_WEIGHTED = "bm25(fts_chunks, 1.0, 1.0, 0.0, 1.0, 1.0)"
+
+_BM25_EMPTY = """
+    bm25_ranked AS (SELECT NULL AS chunk_id, NULL AS r WHERE 0)"""
+
+_FUSED_SELECT = """
+    fused AS (
+        SELECT chunk_id, SUM(1.0 / (:rrf_k + r)) AS rrf_score, MIN(ord) AS ord
+        FROM (
+            SELECT chunk_id, r, r AS ord FROM vector_ranked
+            UNION ALL
+            SELECT chunk_id, r, :vector_limit + r AS ord FROM bm25_ranked
+        )
+        GROUP BY chunk_id
+    )
+SELECT {columns}, f.rrf_score
+FROM fused f
+JOIN document_chunks c ON c.chunk_id = f.chunk_id
+ORDER BY f.rrf_score DESC, f.ord
+LIMIT :rrf_limit
+"""
+
+
+_DETAIL_COLUMNS = """c.chunk_id, c.document_name, c.category, c.section_header,
+       c.generation_chunk, c.last_updated, c.chunk_metadata"""
+_TEXT_COLUMNS = "c.chunk_id, c.generation_chunk"
+
+
+def _build_hybrid_sql(
+    *, category: bool, bm25: bool, details: bool = True, vec_category: bool = True
+) -> str:
+    """Assemble the fused query, optionally category-filtered and/or without the BM25 leg.
+
+    With ``details=False`` only ``chunk_id`` and ``generation_chunk`` are
+    selected — all the reranker needs from its candidate pool.
+    ``vec_category`` says whether vec_chunks carries the ``category``
+    metadata column the vector leg can filter on.
+    """
+    if not category:
+        vector_filter = ""
+    elif vec_category:
+        vector_filter = " AND v.category = :category"
+    else:
+        vector_filter = " AND c.category = :category"
+    vector = _VECTOR_RANKED.format(category_filter=vector_filter)
+    if not bm25:
+        bm25_cte = _BM25_EMPTY
+    else:
+        bm25_cte = _BM25_RANKED.format(
+            bm25=_BM25_CATEGORY_WEIGHTED if category else "bm25(fts_chunks)"
+        )
+    fused = _FUSED_SELECT.format(columns=_DETAIL_COLUMNS if details else _TEXT_COLUMNS)
+    return f"WITH{vector},{bm25_cte},{fused}"
+
+
+# Keyed by (category filter?, BM25 leg?, full details?, vec0 category
+# column?) — built once so each variant is a constant string for the
+# statement cache.
+_HYBRID_SQL = {
+    (category, bm25, details, vec_category): _build_hybrid_sql(
+        category=category, bm25=bm25, details=details, vec_category=vec_category
+    )
+    for category in (False, True)
+    for bm25 in (False, True)
+    for details in (False, True)
+    for vec_category in (False, True)
+}
+
+
+# The categories the data pipeline indexes (DOCUMENT_CATEGORIES), keyed by
+# every spelling accepted from the agent: either case, singular or plural.
+_CATEGORIES = {
+    "domain": "domain",
+    "domains": "domain",
+    "policy": "policies",
+    "policies": "policies",
+    "runbook": "runbooks",
+    "runbooks": "runbooks",
+}
+
+
+def _normalize_category(category: str | None) -> str | None:
+    """Map a requested category onto an indexed one, or None for no filter.
+
+    Both legs then filter on the same exact value — the vector leg compares
+    with ``=`` while FTS5 matches stemmed, case-folded tokens, so a loose
+    spelling would otherwise empty one leg but not the other.  An unknown
+    category searches everything rather than returning nothing.
+    """
+    if not category:
+        return None
+    normalized = _CATEGORIES.get(category.strip().lower())
+    if normalized is None:
+        logger.warning("Unknown search category {!r}; searching all categories", category)
+    return normalized
+
+
+def _category_match(category: str, query: str) -> str:
+    """Restrict an FTS5 *query* to rows whose ``category`` column is *category*."""
+    escaped = category.replace('"', '""')
+    return f'category : "{escaped}" AND ({query})'
+
+
+_BATCHER_STOPPED = "Embedding batcher stopped"
+
+
+def _fail_pending(futures: Iterable[asyncio.Future], exc: BaseException) -> None:
+    """Set *exc* on every future in *futures* that is not resolved yet."""
+    for future in futures:
+        if not future.done():
+            future.set_exception(exc)
+
+
+@dataclass(frozen=True, slots=True)
+class _QueryEmbedding:
+    """A query vector together with its float32 blob, serialized once for sqlite-vec."""
+
+    values: tuple[float, ...]
+    blob: bytes
+
+    @classmethod
+    def from_values(cls, values: tuple[float, ...]) -> "_QueryEmbedding":
+        return cls(values, serialize_float32(values))
+
 
 @dataclass
 class RetrievalResult:
@@ -43,12 +238,33 @@ class RetrievalService:
         reranker_api_key: str | None = None,
         reranker_model: str = "rerank-v3.5",
         reranker_top_n: int = 5,
+        embedding_cache_size: int = 1024,
+        embedding_batch_size: int = 16,
+        embedding_batch_delay_ms: int = 10,
+        pool_size: int = 8,
     ):
         self.db_path = db_path
         self.embedding_client = embedding_client
         self.embedding_deployment = embedding_deployment
         self.embedding_dimensions = embedding_dimensions
-        self.conn: sqlite3.Connection | None = None
+        self.pool_size = pool_size
+        self._pool: queue.Queue[sqlite3.Connection] | None = None
+        # Whether vec_chunks has the ``category`` metadata column (set on connect)
+        self._vec_category = True
+
+        # Query-embedding LRU cache (0 disables it)
+        self.embedding_cache_size = embedding_cache_size
+        self.embedding_cache_hits = 0
+        self.embedding_cache_misses = 0
+        self._embedding_cache: OrderedDict[str, _QueryEmbedding] = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+
+        # Dynamic embedding batcher (see start_embedding_batcher)
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_delay_ms = embedding_batch_delay_ms
+        self._embed_queue: asyncio.Queue[tuple[str, asyncio.Future[_QueryEmbedding]]] | None = None
+        self._embed_task: asyncio.Task | None = None
+        self._embed_batches: set[asyncio.Task] = set()  # batches awaiting the API
 
         # Reranker config
         self.reranker_enabled = reranker_enabled
@@ -56,111 +272,289 @@ class RetrievalService:
         self.reranker_model = reranker_model
         self.reranker_top_n = reranker_top_n
 
+        # One client for the service's lifetime keeps its HTTP connection pool warm
+        self._reranker_client = None
         if self.reranker_enabled:
-            logger.info("Reranker enabled (model=%s, top_n=%d)", reranker_model, reranker_top_n)
+            logger.info("Reranker enabled (model={}, top_n={})", reranker_model, reranker_top_n)
+            if self.reranker_api_key:
+                self._reranker_client = self._create_reranker_client(self.reranker_api_key)
         else:
             logger.info("Reranker disabled — using RRF scores only")
 
     def connect(self) -> None:
-        """Connect to the SQLite database and load the vector extension."""
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.conn.enable_load_extension(True)
-        sqlite_vec.load(self.conn)
-        self.conn.enable_load_extension(False)
-        self.conn.row_factory = sqlite3.Row
+        """Open a pool of ``pool_size`` connections, each with the vector extension loaded.
+
+        A single shared connection serializes concurrent searches on SQLite's
+        connection mutex; separate connections let them read in parallel.
+        """
+        self._pool = queue.Queue()
+        for _ in range(max(self.pool_size, 1)):
+            self._pool.put(self._open_connection())
+
+        with self._borrow() as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(vec_chunks)")}
+        self._vec_category = not columns or "category" in columns
+        if not self._vec_category:
+            logger.warning(
+                "vec_chunks has no category column — category-filtered vector search "
+                "falls back to a join. Rebuild the knowledge DB to index categories."
+            )
 
     def close(self) -> None:
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close every pooled database connection."""
+        if self._pool is None:
+            return
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._pool = None
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open one read-only connection with sqlite-vec loaded.
+
+        The file is opened through a ``mode=ro`` URI, so searches can never
+        change the knowledge DB or its journal mode.
+        """
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _borrow(self) -> Iterator[sqlite3.Connection]:
+        """Check a connection out of the pool, blocking while all are in use."""
+        if self._pool is None:
+            raise RuntimeError("Not connected")
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
 
     # ------------------------------------------------------------------
     # Embedding
     # ------------------------------------------------------------------
 
     def embed_query(self, text: str) -> list[float]:
-        """Generate an embedding vector for a query string."""
+        """Generate an embedding vector for a query string.
+
+        Results are kept in an LRU cache keyed by deployment, dimensions and
+        text, so a repeated query skips the embedding API round-trip.
+        """
+        return list(self._embed(text).values)
+
+    async def embed_query_async(self, text: str) -> list[float]:
+        """Async :meth:`embed_query` that coalesces concurrent calls into one API request.
+
+        While the batcher is running, cache misses are queued and sent as a
+        single ``embeddings.create(input=[...])`` call together with whatever
+        other queries arrive within ``embedding_batch_delay_ms``.  Without
+        the batcher this falls back to ``embed_query`` in a worker thread.
+        """
+        return list((await self._embed_async(text)).values)
+
+    def _embed(self, text: str) -> _QueryEmbedding:
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
+        embedding = self._embed_batch_uncached([text])[0]
+        self._cache_put(text, embedding)
+        return embedding
+
+    async def _embed_async(self, text: str) -> _QueryEmbedding:
+        if self._embed_queue is None:
+            return await asyncio.to_thread(self._embed, text)
+
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
+        future: asyncio.Future[_QueryEmbedding] = asyncio.get_running_loop().create_future()
+        await self._embed_queue.put((text, future))
+        return await future
+
+    def start_embedding_batcher(self) -> None:
+        """Start the background task behind :meth:`embed_query_async` (needs a running loop)."""
+        self._embed_queue = asyncio.Queue()
+        self._embed_task = asyncio.create_task(self._run_embedding_batcher())
+
+    async def stop_embedding_batcher(self) -> None:
+        """Stop the batcher; later async calls fall back to per-query requests.
+
+        Batches already sent to the API are allowed to finish; queries still
+        waiting in the queue fail instead of hanging.
+        """
+        if self._embed_task:
+            self._embed_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._embed_task
+        if self._embed_batches:
+            await asyncio.gather(*self._embed_batches, return_exceptions=True)
+        if self._embed_queue is not None:
+            stopped = RuntimeError(_BATCHER_STOPPED)
+            while not self._embed_queue.empty():
+                _, future = self._embed_queue.get_nowait()
+                _fail_pending((future,), stopped)
+        self._embed_queue = None
+        self._embed_task = None
+
+    async def _run_embedding_batcher(self) -> None:
+        """Collect queued queries into batches, each embedded by its own task.
+
+        The collector goes straight back to the queue after handing a batch
+        off, so several embedding requests can be in flight at once.
+        """
+        assert self._embed_queue
+        queue = self._embed_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            try:
+                deadline = loop.time() + self.embedding_batch_delay_ms / 1000
+                while len(batch) < self.embedding_batch_size:
+                    timeout = deadline - loop.time()
+                    try:
+                        if timeout > 0:
+                            batch.append(await asyncio.wait_for(queue.get(), timeout))
+                        else:
+                            batch.append(queue.get_nowait())
+                    except (asyncio.QueueEmpty, TimeoutError):
+                        break
+            except asyncio.CancelledError:
+                _fail_pending((future for _, future in batch), RuntimeError(_BATCHER_STOPPED))
+                raise
+
+            task = asyncio.create_task(self._embed_queued_batch(batch))
+            self._embed_batches.add(task)
+            task.add_done_callback(self._embed_batches.discard)
+
+    async def _embed_queued_batch(
+        self, batch: list[tuple[str, asyncio.Future[_QueryEmbedding]]]
+    ) -> None:
+        """Embed one collected batch and resolve every future in it, even on failure."""
+        # Identical queries in one batch share a single input slot.
+        waiting: dict[str, list[asyncio.Future[_QueryEmbedding]]] = {}
+        for text, future in batch:
+            waiting.setdefault(text, []).append(future)
+        texts = list(waiting)
+        futures = [future for _, future in batch]
+
+        try:
+            embeddings = await asyncio.to_thread(self._embed_batch_uncached, texts)
+            for text, embedding in zip(texts, embeddings, strict=True):
+                self._cache_put(text, embedding)
+                for future in waiting[text]:
+                    if not future.done():
+                        future.set_result(embedding)
+        except Exception as exc:
+            _fail_pending(futures, exc)
+        finally:
+            # Cancelled mid-call: nothing may be left waiting forever
+            _fail_pending(futures, RuntimeError(_BATCHER_STOPPED))
+
+    def _embed_batch_uncached(self, texts: list[str]) -> list[_QueryEmbedding]:
+        """Call the embedding API once for *texts*, returning vectors in input order.
+
+        Each vector is serialized for sqlite-vec here, once, so cached
+        queries reuse the blob instead of re-packing it on every search.
+        """
         response = self.embedding_client.embeddings.create(
-            input=text,
+            input=texts,
             model=self.embedding_deployment,
             dimensions=self.embedding_dimensions,
         )
-        return [float(x) for x in response.data[0].embedding]
+        ordered = sorted(response.data, key=lambda item: item.index)
+        embeddings = [
+            _QueryEmbedding.from_values(tuple(float(x) for x in item.embedding)) for item in ordered
+        ]
+        if embeddings and len(embeddings[0].values) != self.embedding_dimensions:
+            raise ValueError(
+                f"Embedding deployment returned {len(embeddings[0].values)} dimensions, "
+                f"expected {self.embedding_dimensions}"
+            )
+        return embeddings
 
     # ------------------------------------------------------------------
-    # Individual search methods
+    # Embedding cache
     # ------------------------------------------------------------------
 
-    def _vector_search(
-        self,
-        query_embedding: list[float],
-        limit: int,
-        category: str | None,
-    ) -> list[tuple[str, float]]:
-        """Search by vector similarity. Returns (chunk_id, distance) pairs."""
-        if not self.conn:
-            raise RuntimeError("Not connected")
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(
+            f"{self.embedding_deployment}\0{self.embedding_dimensions}\0{text}".encode()
+        ).hexdigest()
+
+    def _cache_get(self, text: str) -> _QueryEmbedding | None:
+        """Return the cached embedding for *text* (counting a hit or miss), if any."""
+        if self.embedding_cache_size <= 0:
+            return None
+        key = self._cache_key(text)
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(key)
+            if cached is None:
+                self.embedding_cache_misses += 1
+                return None
+            self._embedding_cache.move_to_end(key)
+            self.embedding_cache_hits += 1
+            return cached
+
+    def _cache_put(self, text: str, embedding: _QueryEmbedding) -> None:
+        """Store *embedding*, evicting the least recently used entries beyond the size."""
+        if self.embedding_cache_size <= 0:
+            return
+        key = self._cache_key(text)
+        with self._embedding_cache_lock:
+            self._embedding_cache[key] = embedding
+            self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > self.embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
 
-        cursor = self.conn.cursor()
-        if category:
-            cursor.execute(
-                """
-                SELECT c.chunk_id, v.distance
-                FROM vec_chunks v
-                JOIN document_chunks c ON v.chunk_id = c.chunk_id
-                WHERE c.category = ? AND v.embedding MATCH ? AND v.k = ?
-                ORDER BY v.distance
-                """,
-                (category, serialize_float32(query_embedding), limit),
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT c.chunk_id, v.distance
-                FROM vec_chunks v
-                JOIN document_chunks c ON v.chunk_id = c.chunk_id
-                WHERE v.embedding MATCH ? AND v.k = ?
-                ORDER BY v.distance
-                """,
-                (serialize_float32(query_embedding), limit),
-            )
-        return [(row["chunk_id"], row["distance"]) for row in cursor.fetchall()]
+    # ------------------------------------------------------------------
+    # Hybrid search query
+    # ------------------------------------------------------------------
 
-    def _bm25_search(
+    def _hybrid_query(
         self,
         query: str,
-        limit: int,
+        query_blob: bytes,
         category: str | None,
-    ) -> list[tuple[str, float]]:
-        """Search by BM25 full-text ranking. Returns (chunk_id, bm25_score) pairs."""
-        if not self.conn:
-            raise RuntimeError("Not connected")
-
-        cursor = self.conn.cursor()
-        if category:
-            cursor.execute(
-                """
-                SELECT fts_chunks.chunk_id, bm25(fts_chunks) AS bm25_score
-                FROM fts_chunks
-                JOIN document_chunks c ON fts_chunks.chunk_id = c.chunk_id
-                WHERE fts_chunks MATCH ? AND c.category = ?
-                ORDER BY bm25_score
-                LIMIT ?
-                """,
-                (query, category, limit),
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT fts_chunks.chunk_id, bm25(fts_chunks) AS bm25_score
-                FROM fts_chunks
-                WHERE fts_chunks MATCH ?
-                ORDER BY bm25_score
-                LIMIT ?
-                """,
-                (query, limit),
-            )
-        return [(row["chunk_id"], row["bm25_score"]) for row in cursor.fetchall()]
+        vector_limit: int,
+        bm25_limit: int,
+        rrf_limit: int,
+        rrf_k: int,
+        details: bool = True,
+    ) -> list[sqlite3.Row]:
+        """Rank, RRF-fuse and load the top chunks in a single SQL statement.
+
+        Falls back to the vector leg alone when *query* is not valid FTS5
+        syntax, matching the old behaviour of skipping a failed BM25 search.
+        With ``details=False`` rows carry only ``chunk_id``,
+        ``generation_chunk`` and ``rrf_score``.
+        """
+        params = {
+            "embedding": query_blob,
+            "vector_limit": vector_limit,
+            "query": _category_match(category, query) if category else query,
+            "bm25_limit": bm25_limit,
+            "category": category,
+            "rrf_k": rrf_k,
+            "rrf_limit": rrf_limit,
+        }
+        with self._borrow() as conn:
+            try:
+                return conn.execute(
+                    _HYBRID_SQL[bool(category), True, details, self._vec_category], params
+                ).fetchall()
+            except sqlite3.OperationalError:
+                logger.debug("BM25 leg failed for {!r} — using vector results only", query)
+                return conn.execute(
+                    _HYBRID_SQL[bool(category), False, details, self._vec_category], params
+                ).fetchall()
 
     # ------------------------------------------------------------------
     # Chunk detail lookup
@@ -168,21 +562,18 @@ class RetrievalService:
 
     def _get_chunk_details(self, chunk_id: str) -> dict | None:
         """Fetch full chunk data by chunk_id."""
-        if not self.conn:
+        return self._get_chunks_details([chunk_id]).get(chunk_id)
+
+    def _get_chunks_details(self, chunk_ids: list[str]) -> dict[str, dict]:
+        """Fetch full chunk data for several chunk_ids in one query, keyed by chunk_id."""
+        if self._pool is None:
             raise RuntimeError("Not connected")
+        if not chunk_ids:
+            return {}
 
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT chunk_id, document_name, category, section_header,
-                   generation_chunk, last_updated, chunk_metadata
-            FROM document_chunks
-            WHERE chunk_id = ?
-            """,
-            (chunk_id,),
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        with self._borrow() as conn:
+            cursor = conn.execute(_SQL_DETAILS, (json.dumps(chunk_ids),))
+            return {row["chunk_id"]: dict(row) for row in cursor.fetchall()}
 
     # ------------------------------------------------------------------
     # Reciprocal Rank Fusion
@@ -196,6 +587,8 @@ class RetrievalService:
     ) -> list[tuple[str, float]]:
         """Combine two ranked lists using RRF.
 
+        Reference implementation of the fusion that :meth:`search` runs in SQL.
+
         Args:
             vector_results: (chunk_id, distance) from vector search, sorted ascending.
             bm25_results: (chunk_id, bm25_score) from BM25 search, sorted ascending.
@@ -215,57 +608,54 @@ class RetrievalService:
     # Optional reranker
     # ------------------------------------------------------------------
 
-    def _rerank(
-        self,
-        query: str,
-        candidates: list[RetrievalResult],
-    ) -> list[RetrievalResult]:
-        """Re-score candidates using a cross-encoder reranker API.
+    @staticmethod
+    def _create_reranker_client(api_key: str):
+        """Build the Cohere client once, or return None if ``cohere`` is not installed."""
+        try:
+            import cohere
+        except ImportError:
+            logger.warning(
+                "Reranker enabled but 'cohere' package not installed. "
+                "Install it with: pip install cohere"
+            )
+            return None
+        return cohere.Client(api_key=api_key, timeout=_RERANKER_TIMEOUT_S)
+
+    @property
+    def _reranking(self) -> bool:
+        """True when a rerank pass will actually call the reranker."""
+        return (
+            self.reranker_enabled
+            and bool(self.reranker_api_key)
+            and self._reranker_client is not None
+        )
+
+    def _rerank_documents(self, query: str, documents: list[str]) -> list[tuple[int, float]] | None:
+        """Call the cross-encoder reranker on raw texts.
 
-        If the reranker is disabled or unavailable, returns candidates unchanged.
+        Returns ``(index into documents, relevance_score)`` pairs, best first,
+        or None if the call failed so the caller keeps the RRF ordering.
         Currently supports Cohere-compatible rerank APIs.  Swap the implementation
         for Azure AI, Jina, or a local cross-encoder as needed.
         """
-        if not self.reranker_enabled or not self.reranker_api_key:
-            return candidates
-
-        if not candidates:
-            return candidates
-
         try:
-            import cohere
-
-            client = cohere.Client(api_key=self.reranker_api_key)
-            docs = [c.generation_chunk for c in candidates]
-            response = client.rerank(
+            response = self._reranker_client.rerank(
                 model=self.reranker_model,
                 query=query,
-                documents=docs,
+                documents=documents,
                 top_n=self.reranker_top_n,
             )
-            reranked: list[RetrievalResult] = []
-            for hit in response.results:
-                result = candidates[hit.index]
-                result.score = hit.relevance_score
-                reranked.append(result)
-            logger.info("Reranker returned %d results", len(reranked))
-            return reranked
-
-        except ImportError:
-            logger.warning(
-                "Reranker enabled but 'cohere' package not installed. "
-                "Install it with: pip install cohere"
-            )
-            return candidates
         except Exception:
             logger.exception("Reranker failed — falling back to RRF ordering")
-            return candidates
+            return None
+        logger.info("Reranker returned {} results", len(response.results))
+        return [(hit.index, hit.relevance_score) for hit in response.results]
 
     # ------------------------------------------------------------------
     # Public search API
     # ------------------------------------------------------------------
 
-    def search(
+    async def search(
         self,
         query: str,
         category: str | None = None,
@@ -276,9 +666,14 @@ class RetrievalService:
     ) -> list[RetrievalResult]:
         """Run hybrid search: embed → vector + BM25 → RRF merge → (rerank) → top results.
 
+        The query is embedded through the batcher/LRU, then a single SQL
+        statement ranks both legs, fuses them and joins the chunk details.
+        The blocking SQLite and reranker calls run in a worker thread.
+
         Args:
             query: The user's search query.
-            category: Optional category filter ('domain', 'policies', 'runbooks').
+            category: Optional category filter ('domain', 'policies', 'runbooks');
+                case and singular forms are accepted, unknown values are ignored.
             vector_limit: How many vector results to fetch.
             bm25_limit: How many BM25 results to fetch.
             final_limit: How many final results to return after fusion.
@@ -287,54 +682,99 @@ class RetrievalService:
         Returns:
             List of RetrievalResult, ordered by relevance.
         """
-        # 1) Embed the query
-        query_embedding = self.embed_query(query)
-
-        # 2) Vector search
-        vector_results = self._vector_search(query_embedding, vector_limit, category)
+        query_embedding = await self._embed_async(query)
+        return await asyncio.to_thread(
+            self._search_embedded,
+            query,
+            query_embedding.blob,
+            _normalize_category(category),
+            vector_limit,
+            bm25_limit,
+            final_limit,
+            rrf_k,
+        )
 
-        # 3) BM25 search (gracefully handle FTS5 syntax errors)
-        try:
-            bm25_results = self._bm25_search(query, bm25_limit, category)
-        except Exception:
-            bm25_results = []
+    def _search_embedded(
+        self,
+        query: str,
+        query_blob: bytes,
+        category: str | None,
+        vector_limit: int,
+        bm25_limit: int,
+        final_limit: int,
+        rrf_k: int,
+    ) -> list[RetrievalResult]:
+        """Run the fused query for an embedded query and optionally rerank."""
+        if self._reranking:
+            return self._search_reranked(
+                query, query_blob, category, vector_limit, bm25_limit, final_limit, rrf_k
+            )
 
-        # 4) Fuse with RRF
-        # When reranker is enabled, fetch more candidates so the reranker has a
-        # richer pool to re-score.
-        rrf_limit = (
-            max(final_limit, self.reranker_top_n * 2) if self.reranker_enabled else final_limit
+        rows = self._hybrid_query(
+            query, query_blob, category, vector_limit, bm25_limit, final_limit, rrf_k
         )
-        fused = self.reciprocal_rank_fusion(vector_results, bm25_results, k=rrf_k)
-
-        # 5) Fetch chunk details for top candidates
-        candidates: list[RetrievalResult] = []
-        for chunk_id, score in fused[:rrf_limit]:
-            details = self._get_chunk_details(chunk_id)
-            if details:
-                metadata = details.get("chunk_metadata") or {}
-                if isinstance(metadata, str):
-                    try:
-                        metadata = json.loads(metadata)
-                    except (json.JSONDecodeError, TypeError):
-                        metadata = {}
-
-                candidates.append(
-                    RetrievalResult(
-                        chunk_id=details["chunk_id"],
-                        document_name=details["document_name"],
-                        category=details["category"],
-                        section_header=details["section_header"],
-                        generation_chunk=details["generation_chunk"],
-                        last_updated=details["last_updated"],
-                        score=score,
-                        chunk_metadata=metadata,
-                    )
-                )
-
-        # 6) Optional reranker pass
-        if self.reranker_enabled:
-            candidates = self._rerank(query, candidates)
-            candidates = candidates[:final_limit]
+        return [_to_result(row, row["rrf_score"]) for row in rows]
+
+    def _search_reranked(
+        self,
+        query: str,
+        query_blob: bytes,
+        category: str | None,
+        vector_limit: int,
+        bm25_limit: int,
+        final_limit: int,
+        rrf_k: int,
+    ) -> list[RetrievalResult]:
+        """Rerank a wider RRF pool, loading full details only for the winners.
 
-        return candidates
+        The candidate pool is fetched as ``(chunk_id, generation_chunk)`` —
+        all the reranker reads — and the remaining columns are loaded for
+        the ``final_limit`` survivors in one batched lookup.
+        """
+        # Fetch more candidates so the reranker has a richer pool to re-score.
+        rrf_limit = max(final_limit, self.reranker_top_n * 2)
+        rows = self._hybrid_query(
+            query,
+            query_blob,
+            category,
+            vector_limit,
+            bm25_limit,
+            rrf_limit,
+            rrf_k,
+            details=False,
+        )
+        if not rows:
+            return []
+
+        order = self._rerank_documents(query, [row["generation_chunk"] for row in rows])
+        if order is None:
+            order = [(i, row["rrf_score"]) for i, row in enumerate(rows)]
+        winners = [(rows[i]["chunk_id"], score) for i, score in order[:final_limit]]
+
+        details = self._get_chunks_details([chunk_id for chunk_id, _ in winners])
+        return [
+            _to_result(details[chunk_id], score)
+            for chunk_id, score in winners
+            if chunk_id in details
+        ]
+
+
+def _to_result(row: sqlite3.Row | dict, score: float) -> RetrievalResult:
+    """Build a RetrievalResult from a chunk row, decoding its JSON metadata."""
+    metadata = row["chunk_metadata"] or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except (json.JSONDecodeError, TypeError):
+            metadata = {}
+
+    return RetrievalResult(
+        chunk_id=row["chunk_id"],
+        document_name=row["document_name"],
+        category=row["category"],
+        section_header=row["section_header"],
+        generation_chunk=row["generation_chunk"],
+        last_updated=row["last_updated"],
+        score=score,
+        chunk_metadata=metadata,
+    )
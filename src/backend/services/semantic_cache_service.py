@@ -0,0 +1,166 @@
+"""Process-level semantic cache for final chat answers.
+
+Answers are keyed by the embedding of the user's question and kept in an
+in-memory sqlite-vec index.  A new question whose embedding is close enough
+to a cached one (cosine similarity >= threshold) is answered straight from
+the cache, skipping the LLM and every tool call.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+import sqlite_vec
+from loguru import logger
+from sqlite_vec import serialize_float32
+
+
+@dataclass
+class CachedAnswer:
+    """A cached answer with the metadata that was persisted alongside it."""
+
+    answer: str
+    tool_calls: list[dict] = field(default_factory=list)
+    sources: list[dict] = field(default_factory=list)
+    similarity: float = 1.0
+
+
+class SemanticCacheService:
+    """Nearest-neighbour cache of answers, scoped to the running process.
+
+    Entries expire after ``ttl_seconds`` so answers pick up knowledge-base
+    changes, and the oldest entries are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        embedding_dimensions: int = 1536,
+        *,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: int = 3600,
+        max_entries: int = 1000,
+    ) -> None:
+        self.embedding_dimensions = embedding_dimensions
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.conn: sqlite3.Connection | None = None
+
+    def connect(self) -> None:
+        """Create the in-memory vector index and entry table."""
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.enable_load_extension(True)
+        sqlite_vec.load(self.conn)
+        self.conn.enable_load_extension(False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE vec_cache USING vec0("
+            f"embedding float[{self.embedding_dimensions}] distance_metric=cosine)"
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE cache_entries (
+                id INTEGER PRIMARY KEY,
+                answer TEXT NOT NULL,
+                tool_calls TEXT NOT NULL DEFAULT '[]',
+                sources TEXT NOT NULL DEFAULT '[]',
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        logger.info(
+            "Semantic cache ready (threshold={}, ttl={}s, max_entries={})",
+            self.similarity_threshold,
+            self.ttl_seconds,
+            self.max_entries,
+        )
+
+    def close(self) -> None:
+        """Drop the cache."""
+        if self.conn:
+            self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def lookup(self, embedding: list[float]) -> CachedAnswer | None:
+        """Return the closest cached answer if it is similar enough, else None."""
+        if not self.conn:
+            raise RuntimeError("Not connected")
+
+        self._evict_expired()
+        row = self.conn.execute(
+            """
+            SELECT e.answer, e.tool_calls, e.sources, v.distance
+            FROM vec_cache v
+            JOIN cache_entries e ON e.id = v.rowid
+            WHERE v.embedding MATCH ? AND v.k = 1
+            """,
+            (serialize_float32(embedding),),
+        ).fetchone()
+        if row is None:
+            return None
+
+        similarity = 1.0 - row["distance"]
+        if similarity < self.similarity_threshold:
+            return None
+        return CachedAnswer(
+            answer=row["answer"],
+            tool_calls=json.loads(row["tool_calls"]),
+            sources=json.loads(row["sources"]),
+            similarity=similarity,
+        )
+
+    def store(
+        self,
+        embedding: list[float],
+        answer: str,
+        tool_calls: list[dict] | None = None,
+        sources: list[dict] | None = None,
+    ) -> None:
+        """Cache *answer* under *embedding*, evicting the oldest entries if full."""
+        if not self.conn:
+            raise RuntimeError("Not connected")
+
+        self._evict_expired()
+        cursor = self.conn.execute(
+            "INSERT INTO cache_entries (answer, tool_calls, sources, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (answer, json.dumps(tool_calls or []), json.dumps(sources or []), time.monotonic()),
+        )
+        self.conn.execute(
+            "INSERT INTO vec_cache (rowid, embedding) VALUES (?, ?)",
+            (cursor.lastrowid, serialize_float32(embedding)),
+        )
+
+        overflow = self.conn.execute(
+            "SELECT id FROM cache_entries ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,),
+        ).fetchall()
+        self._delete([row["id"] for row in overflow])
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _evict_expired(self) -> None:
+        """Remove entries older than the TTL."""
+        assert self.conn
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = self.conn.execute(
+            "SELECT id FROM cache_entries WHERE created_at < ?", (cutoff,)
+        ).fetchall()
+        self._delete([row["id"] for row in expired])
+
+    def _delete(self, entry_ids: list[int]) -> None:
+        assert self.conn
+        if not entry_ids:
+            return
+        params = [(entry_id,) for entry_id in entry_ids]
+        self.conn.executemany("DELETE FROM vec_cache WHERE rowid = ?", params)
+        self.conn.executemany("DELETE FROM cache_entries WHERE id = ?", params)
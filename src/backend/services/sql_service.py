@@ -1,6 +1,13 @@
 """Read-only SQL query service for structured data (KPI catalog, employee directory)."""
 
+import queue
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import chain, islice
 from pathlib import Path
 
 TABLE_SCHEMAS = """Available tables and their schemas:
@@ -25,27 +32,114 @@ TABLE: directory
 """
 
 
-_FORBIDDEN_KEYWORDS = frozenset(
-    ["drop", "delete", "insert", "update", "alter", "create", "replace", "attach", "detach"]
+# Applied once per connection.  ``query_only`` makes SQLite itself reject
+# any write, on top of opening the file with ``mode=ro``.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
 )
 
+# Matches at the start only, without upper-casing a copy of the whole query.
+_SELECT_RE = re.compile(r"SELECT\b", re.IGNORECASE)
+
+# Queries whose answer changes without the data changing (``date('now')``,
+# ``CURRENT_TIMESTAMP``, ``random()``) are never served from the result cache.
+_VOLATILE_RE = re.compile(
+    r"\bnow\b|\bcurrent_(?:date|time|timestamp)\b|\brandom(?:blob)?\s*\(", re.IGNORECASE
+)
+
+# sqlite3 keeps this many compiled statements per connection, keyed by the
+# exact SQL text, so repeated LLM lookups skip SQLite's parse/plan step.
+_STATEMENT_CACHE_SIZE = 256
+
 
 class SQLService:
     """Executes read-only SQL queries against the structured data tables."""
 
-    def __init__(self, db_path: Path):
+    __slots__ = (
+        "db_path",
+        "max_rows",
+        "pool_size",
+        "result_cache_size",
+        "_pool",
+        "_result_cache",
+        "_result_cache_stamp",
+        "_result_cache_lock",
+    )
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_rows: int = 200,
+        pool_size: int = 8,
+        result_cache_size: int = 64,
+    ):
         self.db_path = db_path
-        self.conn: sqlite3.Connection | None = None
+        self.max_rows = max_rows
+        self.pool_size = pool_size
+        self._pool: queue.Queue[sqlite3.Connection] | None = None
+
+        # LRU of (max_rows, sql) -> formatted result (0 disables it), dropped
+        # whenever the database files change on disk
+        self.result_cache_size = result_cache_size
+        self._result_cache: OrderedDict[tuple[int, str], str] = OrderedDict()
+        self._result_cache_stamp: tuple[int, ...] = ()
+        self._result_cache_lock = threading.Lock()
 
     def connect(self) -> None:
-        """Open a read-only connection to the database."""
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        """Open a pool of ``pool_size`` read-only connections to the database.
+
+        Concurrent agent turns each borrow their own connection instead of
+        serializing on one shared connection's mutex.
+        """
+        self._pool = queue.Queue()
+        for _ in range(max(self.pool_size, 1)):
+            self._pool.put(self._open_connection())
 
     def close(self) -> None:
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close every pooled database connection."""
+        if self._pool is None:
+            return
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._pool = None
+        with self._result_cache_lock:
+            self._result_cache.clear()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open one read-only connection.
+
+        The file is opened through a ``mode=ro`` URI in autocommit mode, so
+        SQLite enforces read-only access and no transaction is opened per query.
+        """
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,  # pooled connections move between worker threads
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
+        # Rows stay plain tuples — the formatter only iterates them positionally
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _borrow(self) -> Iterator[sqlite3.Connection]:
+        """Check a connection out of the pool, blocking while all are in use."""
+        if self._pool is None:
+            raise RuntimeError("Not connected to database. Call connect() first.")
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
 
     @staticmethod
     def get_schemas() -> str:
@@ -56,38 +150,113 @@ class SQLService:
         """Execute a read-only SQL query and return results as a formatted table.
 
         Only SELECT statements against kpi_catalog and directory are allowed.
+        At most ``max_rows`` rows are returned; a note tells the agent when
+        the result was cut short.  Repeated queries are answered from an
+        in-memory cache until the database changes; queries that read the
+        clock or ``random()`` always run.
         """
-        if not self.conn:
-            raise RuntimeError("Not connected to database. Call connect() first.")
-
-        sql_stripped = sql.strip()
-        sql_upper = sql_stripped.upper()
+        # Drop the optional trailing ";" so "SELECT ...;" and "SELECT ..." share
+        # one cached statement.
+        sql_stripped = sql.strip().rstrip(";").rstrip()
 
-        # Safety: only allow SELECT
-        if not sql_upper.startswith("SELECT"):
+        # Fail fast on anything but a SELECT; writes are also refused by the
+        # read-only connection itself.
+        if not _SELECT_RE.match(sql_stripped):
             return "Error: Only SELECT queries are allowed."
 
-        # Safety: reject dangerous keywords
-        sql_lower = sql_stripped.lower()
-        for keyword in _FORBIDDEN_KEYWORDS:
-            if keyword in sql_lower.split():
-                return f"Error: {keyword.upper()} operations are not allowed."
+        key = (self.max_rows, sql_stripped)
+        cacheable = not _VOLATILE_RE.search(sql_stripped)
+        stamp = self._data_stamp()
+        cached = self._cache_get(key, stamp) if cacheable else None
+        if cached is not None:
+            return cached
 
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(sql_stripped)
-            rows = cursor.fetchall()
+        with self._borrow() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql_stripped)
+                result = self._format_rows(cursor)
+            except Exception as e:
+                return f"SQL Error: {e}"
+            finally:
+                # Reset a statement left mid-result by the row cap as soon as
+                # the connection goes back to the pool.
+                cursor.close()
+        if cacheable:
+            self._cache_put(key, result, stamp)
+        return result
+
+    # ------------------------------------------------------------------
+    # Result cache
+    # ------------------------------------------------------------------
+
+    def _data_stamp(self) -> tuple[int, ...]:
+        """Size and mtime of the database and its WAL file (empty when caching is off).
+
+        Any committed write, such as a data pipeline re-run, changes the stamp.
+        """
+        if self.result_cache_size <= 0:
+            return ()
+        stamp: list[int] = []
+        for path in (self.db_path, self.db_path.with_name(f"{self.db_path.name}-wal")):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                stamp += (0, 0)
+            else:
+                stamp += (st.st_size, st.st_mtime_ns)
+        return tuple(stamp)
+
+    def _cache_get(self, key: tuple[int, str], stamp: tuple[int, ...]) -> str | None:
+        """Return the cached result for *key*, dropping every entry if the data changed."""
+        if self.result_cache_size <= 0:
+            return None
+        with self._result_cache_lock:
+            if stamp != self._result_cache_stamp:
+                self._result_cache.clear()
+                self._result_cache_stamp = stamp
+                return None
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+            return cached
 
-            if not rows:
-                return "No results found."
+    def _cache_put(self, key: tuple[int, str], result: str, stamp: tuple[int, ...]) -> None:
+        """Store *result*, evicting the least recently used entries beyond the size."""
+        if self.result_cache_size <= 0:
+            return
+        with self._result_cache_lock:
+            if stamp != self._result_cache_stamp:
+                return  # the data changed while the query ran
+            self._result_cache[key] = result
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.result_cache_size:
+                self._result_cache.popitem(last=False)
 
-            columns = [desc[0] for desc in cursor.description]
-            lines = [" | ".join(columns)]
-            lines.append(" | ".join("---" for _ in columns))
-            for row in rows:
-                lines.append(" | ".join(str(v) if v is not None else "" for v in row))
+    # ------------------------------------------------------------------
+    # Formatting
+    # ------------------------------------------------------------------
 
-            return "\n".join(lines)
+    def _format_rows(self, cursor: sqlite3.Cursor) -> str:
+        """Render an executed cursor as a markdown table of at most ``max_rows`` rows."""
+        first = cursor.fetchone()
+        if first is None:
+            return "No results found."
 
-        except Exception as e:
-            return f"SQL Error: {e}"
+        columns = [desc[0] for desc in cursor.description]
+        header = " | ".join(columns)
+        separator = " | ".join(["---"] * len(columns))
+        # Rows are formatted as the cursor steps through them, so the raw
+        # result set is never held in memory alongside its text.  SQLite
+        # stops producing rows once the cap is reached.
+        body = "\n".join(
+            " | ".join(["" if v is None else str(v) for v in row])
+            for row in islice(chain((first,), cursor), self.max_rows)
+        )
+        table = f"{header}\n{separator}\n{body}"
+        if cursor.fetchone() is not None:
+            table += (
+                f"\n\n(Showing the first {self.max_rows} rows; add a WHERE clause or "
+                "LIMIT to narrow the result.)"
+            )
+        return table
@@ -8,9 +8,11 @@ tested or invoked from any transport layer (HTTP, CLI, WebSocket, ...).
 
 from __future__ import annotations
 
+import re
 import time
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterable
 from dataclasses import dataclass, field
+from itertools import islice
 
 from loguru import logger
 from pydantic_ai import Agent, ModelRequest, ModelResponse, TextPart, UserPromptPart
@@ -20,6 +22,7 @@ from pydantic_ai.messages import ToolCallPart, ToolReturnPart
 from agent import AgentDeps
 from models import ChatMessage
 from services.retrieval_service import RetrievalService
+from services.semantic_cache_service import CachedAnswer, SemanticCacheService
 from services.sql_service import SQLService
 from use_cases.exceptions import EmptyConversationError
 
@@ -29,13 +32,46 @@ CONTENT_FILTER_REFUSAL = (
     "or any other internal configuration details."
 )
 
+# Header that search_knowledge_base writes for each result (see agent.py).
+# Matched in one pass over the tool output; anchoring on "[Result N]" keeps
+# "Document:" lines inside chunk text from being read as citations.
+_SOURCE_RE = re.compile(
+    r"^\[Result \d+\]\n"
+    r"Document:(?P<document>.*)\n"
+    r"(?:Category:.*\n)?"
+    r"(?:Section:(?P<section>.*)\n)?"
+    r"(?:Last Updated:(?P<date>.*))?",
+    re.MULTILINE,
+)
+
+
+def _parse_sources(content: str) -> list[dict]:
+    """Read the citation fields from each result header in a retrieval tool output."""
+    sources: list[dict] = []
+    for match in _SOURCE_RE.finditer(content):
+        doc = match["document"].strip()
+        if doc:
+            sources.append(
+                {
+                    "document": doc,
+                    "section": (match["section"] or "").strip() or "N/A",
+                    "date": (match["date"] or "").strip() or "Unknown",
+                }
+            )
+    return sources
+
+
+def _elapsed_ms(t0: int) -> int:
+    """Whole milliseconds since *t0*, a ``time.perf_counter_ns()`` reading."""
+    return (time.perf_counter_ns() - t0) // 1_000_000
+
 
 # ---------------------------------------------------------------------------
 # Result container
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatResult:
     """Rich result from a single chat turn, including metadata for persistence."""
 
@@ -62,6 +98,9 @@ class ChatUseCase:
         The hybrid-search retrieval service connected to the SQLite DB.
     sql_service:
         The read-only SQL service connected to the SQLite DB.
+    response_cache:
+        Optional semantic cache.  Standalone questions that closely match a
+        previously answered one are served from it without calling the LLM.
     """
 
     def __init__(
@@ -69,22 +108,27 @@ class ChatUseCase:
         agent: Agent[AgentDeps, str],
         retrieval_service: RetrievalService,
         sql_service: SQLService,
+        response_cache: SemanticCacheService | None = None,
     ) -> None:
         self.agent = agent
         self.retrieval_service = retrieval_service
         self.sql_service = sql_service
+        self.response_cache = response_cache
+        # Holds no per-turn state, so every turn shares one instance
+        self._deps = AgentDeps(retrieval_service=retrieval_service, sql_service=sql_service)
 
     # ------------------------------------------------------------------
     # Public API — non-streaming
     # ------------------------------------------------------------------
 
-    async def execute(self, messages: list[ChatMessage]) -> ChatResult:
+    async def execute(self, messages: list[ChatMessage], *, use_cache: bool = True) -> ChatResult:
         """Run a single chat turn and return a rich result.
 
         Args:
             messages: Full conversation history. The last entry must be the
                       new user message; earlier entries provide context for
                       query rewriting.
+            use_cache: Set to False to bypass the semantic answer cache.
 
         Returns:
             A ``ChatResult`` containing the answer plus tool call / source metadata.
@@ -95,32 +139,40 @@ class ChatUseCase:
         if not messages:
             raise EmptyConversationError("messages list must not be empty")
 
-        deps = AgentDeps(
-            retrieval_service=self.retrieval_service,
-            sql_service=self.sql_service,
+        # Everything before the new user message, read in place (no list copy);
+        # a first turn has no history at all
+        message_history = (
+            self._build_history(islice(messages, len(messages) - 1)) if len(messages) > 1 else None
         )
-
-        message_history = self._build_history(messages[:-1])
         user_prompt = messages[-1].content
 
-        t0 = time.perf_counter()
+        t0 = time.perf_counter_ns()
+
+        cache_key = await self._cache_key(messages, use_cache)
+        cached = self._cache_lookup(cache_key)
+        if cached:
+            return ChatResult(
+                answer=cached.answer,
+                tool_calls=cached.tool_calls,
+                sources=cached.sources,
+                latency_ms=_elapsed_ms(t0),
+            )
 
         try:
             result = await self.agent.run(
                 user_prompt,
-                deps=deps,
-                message_history=message_history if message_history else None,
+                deps=self._deps,
+                message_history=message_history,
             )
         except ModelHTTPError as exc:
-            latency = int((time.perf_counter() - t0) * 1000)
+            latency = _elapsed_ms(t0)
             if self._is_jailbreak_filter(exc):
                 logger.warning("Azure content filter blocked request (jailbreak detection)")
                 return ChatResult(answer=CONTENT_FILTER_REFUSAL, latency_ms=latency)
             raise
 
-        latency = int((time.perf_counter() - t0) * 1000)
-        tool_calls = self._extract_tool_calls(result.all_messages())
-        sources = self._extract_sources(result.all_messages())
+        latency = _elapsed_ms(t0)
+        tool_calls, sources = self._extract_metadata(result.new_messages())
 
         logger.info(
             "Chat completed | latency={}ms | tools={} | sources={}",
@@ -128,6 +180,7 @@ class ChatUseCase:
             len(tool_calls),
             len(sources),
         )
+        self._cache_store(cache_key, result.output, tool_calls, sources)
 
         return ChatResult(
             answer=result.output,
@@ -141,13 +194,19 @@ class ChatUseCase:
     # Public API — streaming
     # ------------------------------------------------------------------
 
-    async def execute_stream(self, messages: list[ChatMessage]) -> AsyncIterator[str | ChatResult]:
+    async def execute_stream(
+        self, messages: list[ChatMessage], *, use_cache: bool = True
+    ) -> AsyncIterator[str | ChatResult]:
         """Run a streaming chat turn.
 
+        Takes the same arguments as :meth:`execute`.
+
         Yields:
             ``str`` chunks as the agent produces text.
             As the **final** item, yields a ``ChatResult`` with the full answer
-            and metadata (tool_calls, sources, latency).
+            and metadata (tool_calls, sources, latency).  A content-filter
+            refusal yields only the ``ChatResult``; callers send its answer
+            whenever it differs from the text already streamed.
 
         Raises:
             EmptyConversationError: If *messages* is empty.
@@ -155,30 +214,43 @@ class ChatUseCase:
         if not messages:
             raise EmptyConversationError("messages list must not be empty")
 
-        deps = AgentDeps(
-            retrieval_service=self.retrieval_service,
-            sql_service=self.sql_service,
+        # Everything before the new user message, read in place (no list copy);
+        # a first turn has no history at all
+        message_history = (
+            self._build_history(islice(messages, len(messages) - 1)) if len(messages) > 1 else None
         )
-
-        message_history = self._build_history(messages[:-1])
         user_prompt = messages[-1].content
 
-        t0 = time.perf_counter()
+        t0 = time.perf_counter_ns()
+
+        cache_key = await self._cache_key(messages, use_cache)
+        cached = self._cache_lookup(cache_key)
+        if cached:
+            yield cached.answer
+            yield ChatResult(
+                answer=cached.answer,
+                tool_calls=cached.tool_calls,
+                sources=cached.sources,
+                latency_ms=_elapsed_ms(t0),
+            )
+            return
 
         try:
             async with self.agent.run_stream(
                 user_prompt,
-                deps=deps,
-                message_history=message_history if message_history else None,
+                deps=self._deps,
+                message_history=message_history,
             ) as stream:
-                full_text = ""
+                # Deltas are already grouped by stream_text's debounce window, so
+                # each one is yielded as is; the answer is joined once at the end.
+                parts: list[str] = []
                 async for chunk in stream.stream_text(delta=True):
-                    full_text += chunk
+                    parts.append(chunk)
                     yield chunk
+                full_text = "".join(parts)
 
-                latency = int((time.perf_counter() - t0) * 1000)
-                tool_calls = self._extract_tool_calls(stream.all_messages())
-                sources = self._extract_sources(stream.all_messages())
+                latency = _elapsed_ms(t0)
+                tool_calls, sources = self._extract_metadata(stream.new_messages())
 
                 logger.info(
                     "Stream completed | latency={}ms | tools={} | sources={}",
@@ -186,6 +258,7 @@ class ChatUseCase:
                     len(tool_calls),
                     len(sources),
                 )
+                self._cache_store(cache_key, full_text, tool_calls, sources)
 
                 yield ChatResult(
                     answer=full_text,
@@ -196,88 +269,114 @@ class ChatUseCase:
                 )
 
         except ModelHTTPError as exc:
-            latency = int((time.perf_counter() - t0) * 1000)
+            latency = _elapsed_ms(t0)
             if self._is_jailbreak_filter(exc):
                 logger.warning("Azure content filter blocked request (jailbreak detection)")
-                yield CONTENT_FILTER_REFUSAL
                 yield ChatResult(answer=CONTENT_FILTER_REFUSAL, latency_ms=latency)
                 return
             raise
 
+    # ------------------------------------------------------------------
+    # Semantic cache
+    # ------------------------------------------------------------------
+
+    async def _cache_key(self, messages: list[ChatMessage], use_cache: bool) -> list[float] | None:
+        """Embed the question for a cache lookup, or return None to bypass the cache.
+
+        Only standalone questions are cached: a follow-up's answer depends on
+        the conversation before it, not just on its own text.
+        """
+        if not use_cache or self.response_cache is None or len(messages) != 1:
+            return None
+        try:
+            return await self.retrieval_service.embed_query_async(messages[-1].content)
+        except Exception:
+            logger.exception("Failed to embed question for the semantic cache — bypassing it")
+            return None
+
+    def _cache_lookup(self, cache_key: list[float] | None) -> CachedAnswer | None:
+        if cache_key is None or self.response_cache is None:
+            return None
+        cached = self.response_cache.lookup(cache_key)
+        if cached:
+            logger.info("Semantic cache hit | similarity={:.3f}", cached.similarity)
+        return cached
+
+    def _cache_store(
+        self,
+        cache_key: list[float] | None,
+        answer: str,
+        tool_calls: list[dict],
+        sources: list[dict],
+    ) -> None:
+        """Cache a grounded answer.
+
+        Answers produced without any tool call (refusals, small talk) are
+        never cached, so e.g. a secret-extraction refusal is always decided
+        by the model itself.
+        """
+        if cache_key is None or self.response_cache is None or not tool_calls:
+            return
+        self.response_cache.store(cache_key, answer, tool_calls, sources)
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
     @staticmethod
     def _build_history(
-        prior_messages: list[ChatMessage],
+        prior_messages: Iterable[ChatMessage],
     ) -> list[ModelRequest | ModelResponse]:
         """Convert prior ChatMessages into PydanticAI message-history objects."""
-        history: list[ModelRequest | ModelResponse] = []
-        for msg in prior_messages:
-            if msg.role == "user":
-                history.append(ModelRequest(parts=[UserPromptPart(content=msg.content)]))
-            else:
-                history.append(ModelResponse(parts=[TextPart(content=msg.content)]))
-        return history
+        return [
+            ModelRequest(parts=[UserPromptPart(content=msg.content)])
+            if msg.role == "user"
+            else ModelResponse(parts=[TextPart(content=msg.content)])
+            for msg in prior_messages
+        ]
 
     @staticmethod
     def _is_jailbreak_filter(exc: ModelHTTPError) -> bool:
         """Return True if the error was caused by Azure's jailbreak content filter."""
-        body = getattr(exc, "body", None) or {}
-        inner = body.get("innererror", {})
-        cfr = inner.get("content_filter_result", {})
-        return cfr.get("jailbreak", {}).get("filtered", False)
+        body = getattr(exc, "body", None)
+        if not isinstance(body, dict):
+            return False
+        try:
+            return bool(body["innererror"]["content_filter_result"]["jailbreak"]["filtered"])
+        except (KeyError, TypeError):
+            return False
 
     @staticmethod
-    def _extract_tool_calls(
+    def _extract_metadata(
         messages: list[ModelRequest | ModelResponse],
-    ) -> list[dict]:
-        """Pull tool-call / tool-return pairs from the PydanticAI message list."""
+    ) -> tuple[list[dict], list[dict]]:
+        """Collect tool calls and source citations in one pass over the message list.
+
+        Callers pass only this turn's messages (``new_messages()``); the prior
+        history is plain text and holds no tool parts.
+        """
         calls: dict[str, dict] = {}
+        sources: list[dict] = []
         for msg in messages:
             for part in msg.parts:
-                if isinstance(part, ToolCallPart):
+                # Exact type checks: both part classes are concrete leaves in pydantic-ai
+                part_type = type(part)
+                if part_type is ToolCallPart:
                     calls[part.tool_call_id] = {
                         "name": part.tool_name,
                         "args": part.args if isinstance(part.args, dict) else {},
                     }
-                elif isinstance(part, ToolReturnPart):
-                    if part.tool_call_id in calls:
-                        content = part.content
-                        if not isinstance(content, str):
-                            content = str(content)
-                        calls[part.tool_call_id]["result"] = content[:500]
-        return list(calls.values())
-
-    @staticmethod
-    def _extract_sources(
-        messages: list[ModelRequest | ModelResponse],
-    ) -> list[dict]:
-        """Extract source citations from retrieval tool results."""
-        sources: list[dict] = []
-        for msg in messages:
-            for part in msg.parts:
-                if isinstance(part, ToolReturnPart) and part.tool_name == "search_knowledge_base":
+                elif part_type is ToolReturnPart:
+                    call = calls.get(part.tool_call_id)
+                    is_search = part.tool_name == "search_knowledge_base"
+                    if call is None and not is_search:
+                        continue  # orphan return: nothing would read its text
                     content = part.content if isinstance(part.content, str) else str(part.content)
-                    for block in content.split("---"):
-                        doc = section = date = None
-                        for line in block.strip().splitlines():
-                            if line.startswith("Document:"):
-                                doc = line.split(":", 1)[1].strip()
-                            elif line.startswith("Section:"):
-                                section = line.split(":", 1)[1].strip()
-                            elif line.startswith("Last Updated:"):
-                                date = line.split(":", 1)[1].strip()
-                        if doc:
-                            sources.append(
-                                {
-                                    "document": doc,
-                                    "section": section or "N/A",
-                                    "date": date or "Unknown",
-                                }
-                            )
-        return sources
+                    if call is not None:
+                        call["result"] = content[:500]
+                    if is_search:
+                        sources.extend(_parse_sources(content))
+        return list(calls.values()), sources
 
 
 # ---------------------------------------------------------------------------
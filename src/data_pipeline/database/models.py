@@ -1,5 +1,6 @@
-"""SQLModel type definitions for database tables."""
+"""SQLModel type definitions for database tables, plus plain records for search data."""
 
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 
 from sqlmodel import JSON, Column, Field, SQLModel
@@ -55,7 +56,13 @@ class DocumentChunk(SQLModel, table=True):
     created_at: datetime = Field(default_factory=_utcnow)
 
 
-class SearchResult(SQLModel):
+# The types below are not tables, so they are slotted dataclasses: no Pydantic
+# validation or per-instance __dict__ when building one per search hit.
+# kw_only keeps the field order and keyword-only construction of the models.
+
+
+@dataclass(slots=True, kw_only=True)
+class SearchResult:
     """Document chunk with search scores (not a table, used for search results)."""
 
     id: int | None = None
@@ -67,7 +74,7 @@ class SearchResult(SQLModel):
     generation_chunk: str
     last_updated: str | None = None
     word_count: int = 0
-    chunk_metadata: dict = Field(default_factory=dict)
+    chunk_metadata: dict = field(default_factory=dict)
     created_at: datetime | None = None
     # Search scores
     distance: float | None = None
@@ -75,14 +82,16 @@ class SearchResult(SQLModel):
     bm25_score: float | None = None
 
 
-class ChunkEmbedding(SQLModel):
+@dataclass(slots=True, kw_only=True)
+class ChunkEmbedding:
     """Embedding data for a chunk (not a table, used for vector operations)."""
 
     chunk_id: str
     embedding: list[float]
 
 
-class ChunkFTS(SQLModel):
+@dataclass(slots=True, kw_only=True)
+class ChunkFTS:
     """FTS5 data for a chunk (not a table, used for full-text search)."""
 
     chunk_id: str
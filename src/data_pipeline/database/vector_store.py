@@ -57,7 +57,8 @@ class VectorStore(VectorStoreInterface):
         cursor.execute(f"""
             CREATE VIRTUAL TABLE IF NOT EXISTS vec_chunks USING vec0(
                 chunk_id TEXT PRIMARY KEY,
-                embedding FLOAT[{self.embedding_dim}]
+                embedding FLOAT[{self.embedding_dim}],
+                category TEXT
             )
         """)
         cursor.execute("""
@@ -91,10 +92,10 @@ class VectorStore(VectorStoreInterface):
             self.session.add(chunk)
             cursor.execute(
                 """
-                INSERT INTO vec_chunks (chunk_id, embedding)
-                VALUES (?, ?)
+                INSERT INTO vec_chunks (chunk_id, embedding, category)
+                VALUES (?, ?, ?)
                 """,
-                (embedding.chunk_id, serialize_float32(embedding.embedding)),
+                (embedding.chunk_id, serialize_float32(embedding.embedding), chunk.category),
             )
             cursor.execute(
                 """
@@ -128,14 +129,14 @@ class VectorStore(VectorStoreInterface):
                 SELECT c.chunk_id, v.distance
                 FROM vec_chunks v
                 JOIN document_chunks c ON v.chunk_id = c.chunk_id
-                WHERE c.category = ?
-                    AND v.embedding MATCH ?
+                WHERE v.embedding MATCH ?
                     AND v.k = ?
+                    AND v.category = ?
                 ORDER BY v.distance
             """
             cursor.execute(
                 query,
-                (category_filter, serialize_float32(query_embedding), limit),
+                (serialize_float32(query_embedding), limit, category_filter),
             )
         else:
             query = """
@@ -175,15 +176,18 @@ class VectorStore(VectorStoreInterface):
             raise RuntimeError("Database not connected. Call connect() first.")
         cursor = self.conn.cursor()
         if category_filter:
+            # Column filter inside MATCH; the category column gets zero weight
+            # so the filter term does not change the score.
             sql = """
-                SELECT fts_chunks.chunk_id, bm25(fts_chunks) as bm25_score
+                SELECT fts_chunks.chunk_id,
+                       bm25(fts_chunks, 1.0, 1.0, 0.0, 1.0, 1.0) as bm25_score
                 FROM fts_chunks
-                JOIN document_chunks c ON fts_chunks.chunk_id = c.chunk_id
-                WHERE fts_chunks MATCH ? AND c.category = ?
+                WHERE fts_chunks MATCH ?
                 ORDER BY bm25_score
                 LIMIT ?
             """
-            cursor.execute(sql, (query, category_filter, limit))
+            escaped = category_filter.replace('"', '""')
+            cursor.execute(sql, (f'category : "{escaped}" AND ({query})', limit))
         else:
             sql = """
                 SELECT fts_chunks.chunk_id, bm25(fts_chunks) as bm25_score
@@ -1,24 +1,73 @@
 """Shared fixtures for backend tests."""
 
+from __future__ import annotations
+
 import sys
 from pathlib import Path
 
+_BACKEND_TESTS = Path(__file__).resolve().parent
+
 # Add src/backend to sys.path so imports like `from services.sql_service import ...` work.
-_BACKEND_SRC = str(Path(__file__).resolve().parent.parent.parent / "src" / "backend")
+_BACKEND_SRC = str(_BACKEND_TESTS.parent.parent / "src" / "backend")
 if _BACKEND_SRC not in sys.path:
     sys.path.insert(0, _BACKEND_SRC)
 
 import json
 import sqlite3
+from typing import TYPE_CHECKING
+from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
 
+from config import Settings
+from services.chat_history_service import ChatHistoryService
 from services.sql_service import SQLService
 
+if TYPE_CHECKING:  # FastAPI is imported only by tests that ask for the app client
+    from fastapi.testclient import TestClient
+
+# app.state entries that tests may swap out; the ``history`` fixture restores them.
+_APP_STATE_KEYS = ("settings", "chat_uc", "history", "title_agent")
+
+# Emptied child-first before each test so foreign keys never block the delete.
+_HISTORY_TABLES = ("messages", "chats", "users")
+
+
+def pytest_addoption(parser):
+    """Register ``--acceptance-url`` for running test_acceptance.py via pytest."""
+    parser.addoption(
+        "--acceptance-url",
+        default=None,
+        help="Base URL of a running backend; acceptance tests are skipped without it.",
+    )
+
 
 def pytest_configure(config):
-    """Set pytest-asyncio mode to auto so async test functions work without markers."""
+    """Set pytest-asyncio auto mode and register the ``integration`` marker."""
     config.option.asyncio_mode = "auto"
+    config.addinivalue_line("markers", "integration: needs a running backend (--acceptance-url)")
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async backend test on one session-wide event loop instead of a loop per test.
+
+    The hook sees the whole session, so tests outside tests/backend (e.g. a
+    root-level ``pytest tests`` run) keep their own loop settings.
+    """
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if item.path.is_relative_to(_BACKEND_TESTS) and pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest.fixture(scope="session")
+def base_url(request) -> str:
+    """Backend URL for acceptance tests (skips them when no live backend is given)."""
+    url = request.config.getoption("--acceptance-url")
+    if not url:
+        pytest.skip("Acceptance tests need a running backend; pass --acceptance-url")
+    return url
 
 
 @pytest.fixture()
@@ -149,6 +198,28 @@ def tmp_vector_db(tmp_path: Path) -> Path:
     return db_path
 
 
+@pytest.fixture(scope="module")
+def _history_db(tmp_path_factory: pytest.TempPathFactory) -> ChatHistoryService:
+    """One chat history database per test module, created (in WAL mode) once."""
+    svc = ChatHistoryService(db_path=tmp_path_factory.mktemp("hist") / "chat.sqlite")
+    svc.connect()
+    svc.conn.execute("PRAGMA synchronous=NORMAL")  # no fsync per test commit
+    yield svc
+    svc.close()
+
+
+@pytest.fixture()
+def history_service(_history_db: ChatHistoryService) -> ChatHistoryService:
+    """The module's ChatHistoryService, emptied and with a cold cache."""
+    conn = _history_db.conn
+    conn.set_trace_callback(None)
+    for table in _HISTORY_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+    conn.commit()
+    _history_db._message_cache.clear()
+    return _history_db
+
+
 @pytest.fixture()
 def sql_service(tmp_db: Path) -> SQLService:
     """A SQLService connected to the temporary database."""
@@ -156,3 +227,67 @@ def sql_service(tmp_db: Path) -> SQLService:
     svc.connect()
     yield svc
     svc.close()
+
+
+# ---------------------------------------------------------------------------
+# FastAPI app fixtures
+# ---------------------------------------------------------------------------
+
+
+def _test_settings(tmp_path: Path) -> Settings:
+    """Create a Settings instance suitable for tests.
+
+    Uses ``_env_file=None`` so the real backend/.env is never loaded.
+    Auth is disabled so the mock user is returned instead of requiring JWT.
+    """
+    return Settings(
+        _env_file=None,
+        azure_openai_api_key="test-key",
+        azure_openai_endpoint="https://test.openai.azure.com/",
+        azure_openai_api_version="2024-02-01",
+        azure_openai_chat_deployment="gpt-4o-mini",
+        azure_openai_embedding_endpoint="https://test.openai.azure.com/",
+        azure_openai_embedding_api_version="2024-02-01",
+        azure_openai_embedding_deployment="text-embedding-3-small",
+        azure_openai_embedding_api_key="test-key",
+        embedding_dimensions=1536,
+        reranker_enabled=False,
+        db_path=tmp_path / "test.sqlite",
+        chat_db_path=tmp_path / "chat_history.sqlite",
+        auth_enabled=False,
+    )
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory: pytest.TempPathFactory) -> TestClient:
+    """A TestClient whose app starts up once per test module."""
+    from fastapi.testclient import TestClient
+
+    settings = _test_settings(tmp_path_factory.mktemp("api"))
+    settings.db_path.touch()  # an empty knowledge DB; the services open it read-only
+    with patch("config.get_settings", return_value=settings):
+        from main import app
+
+        c = TestClient(app)
+        # Skip validation for startup only, so TestSettings can still exercise it
+        with patch("config.Settings.validate_runtime"):
+            c.__enter__()
+        try:
+            yield c
+        finally:
+            c.__exit__(None, None, None)
+
+
+@pytest.fixture()
+def history(client: TestClient, history_service: ChatHistoryService) -> ChatHistoryService:
+    """An empty ChatHistoryService wired into the shared app for one test.
+
+    Any app.state the test replaces is put back afterwards.
+    """
+    state = client.app.state
+    saved = {key: getattr(state, key) for key in _APP_STATE_KEYS}
+    state.history = history_service
+    yield history_service
+    state.history_executor.submit(lambda: None).result()  # flush write-behind saves
+    for key, value in saved.items():
+        setattr(state, key, value)
@@ -44,3 +44,58 @@ class TestAgentDeps:
         deps = AgentDeps(retrieval_service=None, sql_service=None)  # type: ignore[arg-type]
         assert deps.retrieval_service is None
         assert deps.sql_service is None
+
+
+class TestChatModelReuse:
+    """The main and title agents share one chat model / Azure client."""
+
+    def test_agents_share_model(self):
+        from agent import create_agent, create_title_agent
+        from config import Settings
+
+        settings = Settings(
+            azure_openai_api_key="test-key",
+            azure_openai_endpoint="https://test.openai.azure.com/",
+        )
+        assert create_agent(settings).model is create_title_agent(settings).model
+
+    async def test_close_releases_client(self):
+        from agent import close_chat_model, create_agent
+        from config import Settings
+
+        settings = Settings(
+            azure_openai_api_key="test-key",
+            azure_openai_endpoint="https://test.openai.azure.com/",
+        )
+        model = create_agent(settings).model
+        await close_chat_model()
+
+        assert model.client.is_closed()
+        assert create_agent(settings).model is not model
+
+    async def test_close_without_model_builds_nothing(self):
+        from unittest.mock import patch
+
+        import agent
+
+        await agent.close_chat_model()
+        with patch.object(agent, "_build_chat_model") as build:
+            await agent.close_chat_model()
+
+        build.assert_not_called()
+
+    async def test_replaced_client_is_closed(self):
+        from agent import close_chat_model, create_agent
+        from config import Settings
+
+        first = create_agent(
+            Settings(azure_openai_api_key="key-a", azure_openai_endpoint="https://a.azure.com/")
+        ).model
+        second = create_agent(
+            Settings(azure_openai_api_key="key-b", azure_openai_endpoint="https://b.azure.com/")
+        ).model
+        await close_chat_model()
+
+        assert second is not first
+        assert first.client.is_closed()
+        assert second.client.is_closed()
@@ -1,61 +1,38 @@
-"""Tests for the FastAPI presentation layer (routes, models, settings)."""
+"""Tests for the FastAPI presentation layer (routes, models)."""
 
-from pathlib import Path
-from unittest.mock import AsyncMock, patch
+import json
+import threading
+import time
+from unittest.mock import AsyncMock
 
 import pytest
 from fastapi.testclient import TestClient
 
-from config import Settings
 from services.chat_history_service import ChatHistoryService
 from use_cases.chat import ChatResult
 
 
-def _test_settings(tmp_path: Path) -> Settings:
-    """Create a Settings instance suitable for tests.
+class _FakeChatUC:
+    """Stands in for ChatUseCase: returns a fixed result and records the messages sent."""
 
-    Uses ``_env_file=None`` so the real backend/.env is never loaded.
-    Auth is disabled so the mock user is returned instead of requiring JWT.
-    """
-    return Settings(
-        _env_file=None,
-        azure_openai_api_key="test-key",
-        azure_openai_endpoint="https://test.openai.azure.com/",
-        azure_openai_api_version="2024-02-01",
-        azure_openai_chat_deployment="gpt-4o-mini",
-        azure_openai_embedding_endpoint="https://test.openai.azure.com/",
-        azure_openai_embedding_api_version="2024-02-01",
-        azure_openai_embedding_deployment="text-embedding-3-small",
-        azure_openai_embedding_api_key="test-key",
-        embedding_dimensions=1536,
-        reranker_enabled=False,
-        db_path=tmp_path / "test.sqlite",
-        chat_db_path=tmp_path / "chat_history.sqlite",
-        auth_enabled=False,
-    )
-
-
-def _make_history_service(tmp_path: Path) -> ChatHistoryService:
-    """Create a real ChatHistoryService backed by a temp DB."""
-    svc = ChatHistoryService(db_path=tmp_path / "chat_history.sqlite")
-    svc.connect()
-    return svc
+    def __init__(self, result: ChatResult, chunks: tuple[str, ...] = ()) -> None:
+        self.result = result
+        self.chunks = chunks
+        self.calls: list[list] = []
 
+    async def execute(self, messages, *, use_cache=True) -> ChatResult:
+        self.calls.append(messages)
+        return self.result
 
-class TestHealthEndpoint:
-    """Test the /health endpoint."""
+    async def execute_stream(self, messages, *, use_cache=True):
+        self.calls.append(messages)
+        for chunk in self.chunks:
+            yield chunk
+        yield self.result
 
-    @pytest.fixture()
-    def client(self, tmp_path):
-        settings = _test_settings(tmp_path)
-        with (
-            patch("config.get_settings", return_value=settings),
-            patch("config.Settings.validate_runtime"),
-        ):
-            from main import app
 
-            with TestClient(app) as c:
-                yield c
+class TestHealthEndpoint:
+    """Test the /health endpoint."""
 
     def test_health_returns_ok(self, client: TestClient):
         response = client.get("/health")
@@ -66,43 +43,23 @@ class TestHealthEndpoint:
 class TestAuthEndpoint:
     """Test the /auth/login endpoint."""
 
+    @staticmethod
+    def _with_registration(client: TestClient, open_registration: bool) -> TestClient:
+        state = client.app.state
+        state.settings = state.settings.model_copy(update={"open_registration": open_registration})
+        return client
+
     @pytest.fixture()
-    def client_open(self, tmp_path):
+    def client_open(self, client: TestClient, history: ChatHistoryService) -> TestClient:
         """Client with open registration enabled."""
-        settings = _test_settings(tmp_path)
-        settings.open_registration = True
-        with (
-            patch("config.get_settings", return_value=settings),
-            patch("config.Settings.validate_runtime"),
-        ):
-            from main import app
-
-            with TestClient(app) as c:
-                hist = _make_history_service(tmp_path)
-                app.state.settings = settings
-                app.state.history = hist
-                yield c
-                hist.close()
+        return self._with_registration(client, True)
 
     @pytest.fixture()
-    def client_closed(self, tmp_path):
+    def client_closed(self, client: TestClient, history: ChatHistoryService) -> TestClient:
         """Client with open registration disabled (default)."""
-        settings = _test_settings(tmp_path)
-        settings.open_registration = False
-        with (
-            patch("config.get_settings", return_value=settings),
-            patch("config.Settings.validate_runtime"),
-        ):
-            from main import app
-
-            with TestClient(app) as c:
-                hist = _make_history_service(tmp_path)
-                # Seed a registered user
-                hist.seed_users([{"name": "Alice", "email": "alice@northwind.com"}])
-                app.state.settings = settings
-                app.state.history = hist
-                yield c
-                hist.close()
+        # Seed a registered user
+        history.seed_users([{"name": "Alice", "email": "alice@northwind.com"}])
+        return self._with_registration(client, False)
 
     def test_login_returns_token(self, client_open: TestClient):
         response = client_open.post(
@@ -136,6 +93,7 @@ class TestAuthEndpoint:
         assert "No account found" in response.json()["detail"]
 
 
+@pytest.mark.usefixtures("history")
 class TestChatEndpoint:
     """Test the /chat endpoint — HTTP-level concerns only.
 
@@ -143,22 +101,6 @@ class TestChatEndpoint:
     Auth is disabled so a mock user (dev-user) is injected automatically.
     """
 
-    @pytest.fixture()
-    def client(self, tmp_path):
-        settings = _test_settings(tmp_path)
-
-        with (
-            patch("config.get_settings", return_value=settings),
-            patch("config.Settings.validate_runtime"),
-        ):
-            from main import app
-
-            with TestClient(app) as c:
-                hist = _make_history_service(tmp_path)
-                app.state.history = hist
-                yield c
-                hist.close()
-
     def test_chat_rejects_missing_body(self, client: TestClient):
         response = client.post("/chat")
         assert response.status_code == 422
@@ -169,19 +111,20 @@ class TestChatEndpoint:
 
     def test_chat_returns_answer(self, client: TestClient):
         """Verify the route delegates to the use case and wraps the result."""
-        mock_uc = AsyncMock()
-        mock_uc.execute.return_value = ChatResult(
-            answer="Grounded answer [1].\n\nSources:\n[1] doc.md",
-            tool_calls=[
-                {"name": "search_knowledge_base", "args": {"query": "test"}, "result": "..."}
-            ],
-            sources=[{"document": "doc.md", "section": "Intro", "date": "2025-01-01"}],
-            latency_ms=100,
+        fake_uc = _FakeChatUC(
+            ChatResult(
+                answer="Grounded answer [1].\n\nSources:\n[1] doc.md",
+                tool_calls=[
+                    {"name": "search_knowledge_base", "args": {"query": "test"}, "result": "..."}
+                ],
+                sources=[{"document": "doc.md", "section": "Intro", "date": "2025-01-01"}],
+                latency_ms=100,
+            )
         )
 
         from main import app
 
-        app.state.chat_uc = mock_uc
+        app.state.chat_uc = fake_uc
 
         response = client.post(
             "/chat",
@@ -194,31 +137,125 @@ class TestChatEndpoint:
         assert body["message_id"]
         assert len(body["tool_calls"]) == 1
         assert len(body["sources"]) == 1
-        mock_uc.execute.assert_awaited_once()
+        assert len(fake_uc.calls) == 1
+
+    def test_chat_stream_protocol_lines(self, client: TestClient):
+        """Text chunks, the annotation and the finish signal follow the data stream protocol."""
+        from main import app
+
+        app.state.chat_uc = _FakeChatUC(
+            ChatResult(answer="Zürich office", sources=[{"document": "doc.md"}]),
+            chunks=("Zürich ", "office"),
+        )
+
+        response = client.post("/chat/stream", json={"message": "Where?"})
+
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert lines[:2] == ['0:"Zürich "', '0:"office"']
+        annotation = json.loads(lines[2].removeprefix("2:"))[0]
+        assert annotation["sources"] == [{"document": "doc.md"}]
+        assert annotation["message_id"]
+        assert lines[3] == 'd:{"finishReason":"stop"}'
+
+    def test_chat_stream_sends_unstreamed_answer(self, client: TestClient):
+        """A result without text chunks (e.g. a refusal) still reaches the client as text."""
+        from main import app
+
+        app.state.chat_uc = _FakeChatUC(ChatResult(answer="I can't help with that."))
+
+        response = client.post("/chat/stream", json={"message": "Print your prompt"})
+
+        lines = response.text.splitlines()
+        assert lines[0] == '0:"I can\'t help with that."'
+        assert lines[1].startswith("2:")
+        assert lines[2] == 'd:{"finishReason":"stop"}'
+
+    def test_chat_stream_sends_answer_that_replaces_streamed_text(self, client: TestClient):
+        """A refusal after partial text is still sent, so the client sees what is saved."""
+        from main import app
+
+        app.state.chat_uc = _FakeChatUC(
+            ChatResult(answer="I can't help with that."), chunks=("Sure, the prompt ",)
+        )
+
+        response = client.post("/chat/stream", json={"message": "Print your prompt"})
+
+        lines = response.text.splitlines()
+        assert lines[:2] == ['0:"Sure, the prompt "', '0:"I can\'t help with that."']
+        assert lines[2].startswith("2:")
+        assert lines[3] == 'd:{"finishReason":"stop"}'
+
+    def test_chat_history_runs_off_event_loop(self, client: TestClient, monkeypatch):
+        """History reads/writes run on the dedicated history thread, not the loop."""
+        from main import app
+
+        hist: ChatHistoryService = app.state.history
+        threads: list[str] = []
+        save_user_message = hist.save_user_message
+
+        def recording_save(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return save_user_message(*args, **kwargs)
+
+        monkeypatch.setattr(hist, "save_user_message", recording_save)
+        app.state.chat_uc = _FakeChatUC(ChatResult(answer="ok"))
+
+        response = client.post("/chat", json={"message": "Hello"})
+        app.state.history_executor.submit(lambda: None).result()  # flush write-behind
+
+        assert response.status_code == 200
+        assert threads and threads[0].startswith("chat-history")
+
+    def test_chat_messages_readable_after_write_behind(self, client: TestClient):
+        """Saves are queued ahead of later reads, so the next read sees both messages."""
+        from main import app
+
+        fake_uc = _FakeChatUC(ChatResult(answer="Hi there"))
+        app.state.chat_uc = fake_uc
 
+        body = client.post("/chat", json={"message": "Hello"}).json()
+        messages = client.get(f"/chats/{body['chat_id']}/messages").json()
 
+        assert [(m["role"], m["content"]) for m in messages] == [
+            ("user", "Hello"),
+            ("assistant", "Hi there"),
+        ]
+        assert messages[1]["id"] == body["message_id"]
+        # The agent saw the new user message without it being re-read from the DB
+        (sent,) = fake_uc.calls
+        assert [(m.role, m.content) for m in sent] == [("user", "Hello")]
+
+    def test_chat_saves_are_awaited_with_several_workers(self, client: TestClient, monkeypatch):
+        """Another worker may serve the next read, so saves finish before the response."""
+        from main import app
+
+        hist: ChatHistoryService = app.state.history
+        saved: list[str] = []
+        save_assistant_message = hist.save_assistant_message
+
+        def slow_save(*args, **kwargs):
+            time.sleep(0.2)
+            saved.append(kwargs["content"])
+            return save_assistant_message(*args, **kwargs)
+
+        monkeypatch.setattr(app.state.settings, "web_concurrency", 2)
+        monkeypatch.setattr(hist, "save_assistant_message", slow_save)
+        app.state.chat_uc = _FakeChatUC(ChatResult(answer="Hi there"))
+
+        response = client.post("/chat", json={"message": "Hello"})
+
+        assert response.status_code == 200
+        assert saved == ["Hi there"]
+
+
+@pytest.mark.usefixtures("history")
 class TestChatHistoryEndpoints:
     """Test the /chats and /chats/{chat_id}/messages endpoints.
 
     Auth is disabled — user_id comes from the mock user (dev-user).
     """
 
-    @pytest.fixture()
-    def client(self, tmp_path):
-        settings = _test_settings(tmp_path)
-
-        with (
-            patch("config.get_settings", return_value=settings),
-            patch("config.Settings.validate_runtime"),
-        ):
-            from main import app
-
-            with TestClient(app) as c:
-                hist = _make_history_service(tmp_path)
-                app.state.history = hist
-                yield c
-                hist.close()
-
     def test_list_chats_empty(self, client: TestClient):
         response = client.get("/chats")
         assert response.status_code == 200
@@ -255,29 +292,27 @@ class TestChatHistoryEndpoints:
         assert msgs[1]["role"] == "assistant"
         assert msgs[1]["model"] == "gpt-4o-mini"
 
+    def test_chat_messages_match_response_model(self, client: TestClient):
+        from main import app
+        from models import MessageResponse
+
+        hist: ChatHistoryService = app.state.history
+        chat = hist.get_or_create_chat(None, "dev-user")
+        hist.save_assistant_message(chat.id, "Hi", sources=[{"document": "d.md"}])
+
+        (msg,) = client.get(f"/chats/{chat.id}/messages").json()
+        assert list(msg) == list(MessageResponse.model_fields)  # no chat_id, same order
+        assert msg["sources"] == [{"document": "d.md"}]
+
     def test_get_chat_messages_not_found(self, client: TestClient):
         response = client.get("/chats/nonexistent/messages")
         assert response.status_code == 404
 
 
+@pytest.mark.usefixtures("history")
 class TestTitleEndpoint:
     """Test the POST /chats/{chat_id}/title endpoint."""
 
-    @pytest.fixture()
-    def client(self, tmp_path):
-        settings = _test_settings(tmp_path)
-        with (
-            patch("config.get_settings", return_value=settings),
-            patch("config.Settings.validate_runtime"),
-        ):
-            from main import app
-
-            with TestClient(app) as c:
-                hist = _make_history_service(tmp_path)
-                app.state.history = hist
-                yield c
-                hist.close()
-
     def test_title_returns_404_for_unknown_chat(self, client: TestClient):
         response = client.post("/chats/nonexistent/title")
         assert response.status_code == 404
@@ -353,6 +388,31 @@ class TestTitleEndpoint:
         assert body["title"] == "Vacation Policy Overview"
 
 
+class TestCors:
+    """Test that CORS only admits the configured origins."""
+
+    @staticmethod
+    def _preflight(client: TestClient, origin: str):
+        return client.options(
+            "/chat",
+            headers={
+                "Origin": origin,
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "authorization, content-type",
+            },
+        )
+
+    def test_preflight_allowed_origin(self, client: TestClient):
+        response = self._preflight(client, "http://localhost:5173")
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+    def test_preflight_unknown_origin_rejected(self, client: TestClient):
+        response = self._preflight(client, "https://attacker.example")
+        assert response.status_code == 400
+        assert "access-control-allow-origin" not in response.headers
+
+
 class TestModels:
     """Test Pydantic model validation."""
 
@@ -362,6 +422,7 @@ class TestModels:
         req = ChatRequest(message="Hello")
         assert req.message == "Hello"
         assert req.chat_id is None
+        assert req.no_cache is False
 
     def test_chat_request_with_chat_id(self):
         from models import ChatRequest
@@ -395,106 +456,14 @@ class TestModels:
         assert resp.chat_id == "c1"
         assert resp.title == "Production Deployment Guide"
 
+    def test_message_response_from_history_row(self):
+        from pydantic import ValidationError
 
-class TestSettings:
-    """Test the pydantic-settings Settings class."""
+        from models import MessageResponse
+        from services.chat_history_service import Message
 
-    def test_defaults(self):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-        )
-        assert s.azure_openai_chat_deployment == "gpt-4o-mini"
-        assert s.vector_search_limit == 10
-        assert s.rrf_k == 60
-        assert s.reranker_enabled is False
-
-    def test_auth_defaults(self):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-        )
-        assert s.auth_enabled is True
-        assert s.jwt_secret == "dev-secret-change-in-production!!"
-        assert s.jwt_expiry_hours == 24
-        assert s.open_registration is False
-
-    def test_observability_defaults(self):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-        )
-        assert s.observability == "off"
-        assert s.otel_service_name == "knowledge-assistant-backend"
-        assert s.otel_exporter_otlp_endpoint == "http://localhost:4318"
-        assert s.otel_console_exporter is False
-
-    def test_embedding_falls_back_to_chat(self):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-            azure_openai_api_version="2025-01-01",
-        )
-        assert s.azure_openai_embedding_endpoint == "https://ep.openai.azure.com/"
-        assert s.azure_openai_embedding_api_version == "2025-01-01"
-        assert s.azure_openai_embedding_api_key == "k"
-
-    def test_embedding_override(self):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-            azure_openai_embedding_endpoint="https://embed.openai.azure.com/",
-            azure_openai_embedding_api_key="embed-key",
-        )
-        assert s.azure_openai_embedding_endpoint == "https://embed.openai.azure.com/"
-        assert s.azure_openai_embedding_api_key == "embed-key"
-
-    def test_validate_runtime_missing_key(self, tmp_path):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-            db_path=tmp_path / "test.sqlite",
-        )
-        with pytest.raises(ValueError, match="AZURE_OPENAI_API_KEY"):
-            s.validate_runtime()
-
-    def test_validate_runtime_missing_db(self, tmp_path):
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-            db_path=tmp_path / "nonexistent.sqlite",
-        )
-        with pytest.raises(FileNotFoundError, match="Run the data pipeline"):
-            s.validate_runtime()
-
-    def test_validate_runtime_reranker_enabled_no_key(self, tmp_path):
-        db = tmp_path / "test.sqlite"
-        db.touch()
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-            db_path=db,
-            reranker_enabled=True,
-            reranker_api_key=None,
-        )
-        with pytest.raises(ValueError, match="RERANKER_API_KEY"):
-            s.validate_runtime()
-
-    def test_validate_runtime_ok(self, tmp_path):
-        db = tmp_path / "test.sqlite"
-        db.touch()
-        s = Settings(
-            _env_file=None,
-            azure_openai_api_key="k",
-            azure_openai_endpoint="https://ep.openai.azure.com/",
-            db_path=db,
-        )
-        s.validate_runtime()
+        row = Message(id="m1", chat_id="c1", role="assistant", content="Hi", latency_ms=12)
+        resp = MessageResponse.model_validate(row)
+        assert (resp.id, resp.content, resp.latency_ms) == ("m1", "Hi", 12)
+        with pytest.raises(ValidationError):
+            resp.content = "edited"  # frozen
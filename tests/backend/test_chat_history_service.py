@@ -2,22 +2,9 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-
-import pytest
-
 from services.chat_history_service import ChatHistoryService
 
 
-@pytest.fixture()
-def history_service(tmp_path: Path) -> ChatHistoryService:
-    """Create a ChatHistoryService connected to a temp database."""
-    svc = ChatHistoryService(db_path=tmp_path / "chat_history.sqlite")
-    svc.connect()
-    yield svc
-    svc.close()
-
-
 class TestUsers:
     def test_create_user(self, history_service: ChatHistoryService):
         user = history_service.create_user("Alice", "alice@example.com")
@@ -39,6 +26,20 @@ class TestUsers:
         assert user.name == "User"
         assert user.id == "brand-new-id"
 
+    def test_seed_users_from_two_workers(self, history_service: ChatHistoryService):
+        users = [{"name": "Alice", "email": "alice@example.com"}]
+        # a second server worker
+        other = ChatHistoryService(db_path=history_service.db_path)
+        other.connect()
+        other.seed_users(users)
+        other.close()
+
+        # already present — ignored, no IntegrityError
+        history_service.seed_users(users)
+
+        (row,) = history_service.conn.execute("SELECT name FROM users").fetchall()
+        assert row["name"] == "Alice"
+
 
 class TestChats:
     def test_create_new_chat(self, history_service: ChatHistoryService):
@@ -89,9 +90,84 @@ class TestMessages:
         assert msgs[1].model == "gpt-4o-mini"
         assert msgs[1].latency_ms == 150
 
+    def test_caller_supplied_message_ids(self, history_service: ChatHistoryService):
+        user = history_service.create_user("Alice")
+        chat = history_service.get_or_create_chat(None, user.id)
+
+        assert history_service.save_user_message(chat.id, "Hi", message_id="u-1") == "u-1"
+        assert history_service.save_assistant_message(chat.id, "Hey", message_id="a-1") == "a-1"
+        assert [m.id for m in history_service.get_chat_messages(chat.id)] == ["u-1", "a-1"]
+
     def test_empty_chat_returns_empty_list(self, history_service: ChatHistoryService):
         assert history_service.get_chat_messages("nonexistent") == []
 
+    def test_malformed_json_columns_load_as_empty(self, history_service: ChatHistoryService):
+        user = history_service.create_user("Alice")
+        chat = history_service.get_or_create_chat(None, user.id)
+        msg_id = history_service.save_assistant_message(chat.id, "Hi", tool_calls=[{"t": 1}])
+        history_service.conn.execute(
+            "UPDATE messages SET tool_calls = 'not json', sources = NULL WHERE id = ?", (msg_id,)
+        )
+        history_service.conn.commit()
+
+        fresh = ChatHistoryService(db_path=history_service.db_path)  # cold cache
+        fresh.connect()
+        (msg,) = fresh.get_chat_messages(chat.id)
+        fresh.close()
+
+        assert (msg.content, msg.tool_calls, msg.sources) == ("Hi", [], [])
+
+    def test_order_by_time_then_insertion(self, history_service: ChatHistoryService):
+        user = history_service.create_user("Alice")
+        chat = history_service.get_or_create_chat(None, user.id)
+        rows = [  # "z" and "a" share a timestamp; "late" was inserted before "early"
+            ("z", "2026-01-01T00:00:01"),
+            ("a", "2026-01-01T00:00:01"),
+            ("late", "2026-01-01T00:00:02"),
+            ("early", "2026-01-01T00:00:00"),
+        ]
+        history_service.conn.executemany(
+            "INSERT INTO messages (id, chat_id, role, content, created_at) "
+            "VALUES (?, ?, 'user', ?, ?)",
+            [(msg_id, chat.id, msg_id, created_at) for msg_id, created_at in rows],
+        )
+        history_service.conn.commit()
+
+        messages = history_service.get_chat_messages(chat.id)
+
+        assert [m.id for m in messages] == ["early", "z", "a", "late"]
+
+
+class TestMessageCache:
+    def test_saves_keep_cached_history_current(self, history_service: ChatHistoryService):
+        user = history_service.create_user("Alice")
+        chat = history_service.get_or_create_chat(None, user.id)
+        history_service.save_user_message(chat.id, "Hello")
+        history_service.get_chat_messages(chat.id)  # hydrate the cache
+
+        history_service.save_assistant_message(chat.id, "Hi!", sources=[{"document": "d.md"}])
+        statements: list[str] = []
+        history_service.conn.set_trace_callback(statements.append)
+        msgs = history_service.get_chat_messages(chat.id)
+
+        assert [(m.role, m.content) for m in msgs] == [("user", "Hello"), ("assistant", "Hi!")]
+        assert msgs[1].sources == [{"document": "d.md"}]
+        assert not any("json_group_array" in sql for sql in statements)  # served from memory
+
+    def test_out_of_band_write_invalidates(self, history_service: ChatHistoryService):
+        user = history_service.create_user("Alice")
+        chat = history_service.get_or_create_chat(None, user.id)
+        history_service.save_user_message(chat.id, "Hello")
+        history_service.get_chat_messages(chat.id)
+
+        other = ChatHistoryService(db_path=history_service.db_path)  # e.g. another worker
+        other.connect()
+        other.save_assistant_message(chat.id, "From elsewhere")
+        other.close()
+
+        msgs = history_service.get_chat_messages(chat.id)
+        assert [m.content for m in msgs] == ["Hello", "From elsewhere"]
+
 
 class TestListing:
     def test_list_user_chats(self, history_service: ChatHistoryService):
@@ -1,9 +1,16 @@
 """Tests for the retrieval service."""
 
+import asyncio
+import queue
 import sqlite3
+import sys
+import threading
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
+import sqlite_vec
+from sqlite_vec import serialize_float32
 
 from services.retrieval_service import RetrievalResult, RetrievalService
 
@@ -80,8 +87,10 @@ class TestChunkDetailLookup:
         """A RetrievalService with only the plain SQLite connection (no vec)."""
         svc = RetrievalService.__new__(RetrievalService)
         svc.db_path = tmp_vector_db
-        svc.conn = sqlite3.connect(str(tmp_vector_db))
-        svc.conn.row_factory = sqlite3.Row
+        conn = sqlite3.connect(str(tmp_vector_db))
+        conn.row_factory = sqlite3.Row
+        svc._pool = queue.Queue()
+        svc._pool.put(conn)
         svc.embedding_client = None  # type: ignore[assignment]
         svc.embedding_deployment = ""
         svc.embedding_dimensions = 1536
@@ -90,7 +99,7 @@ class TestChunkDetailLookup:
         svc.reranker_model = ""
         svc.reranker_top_n = 5
         yield svc
-        svc.conn.close()
+        conn.close()
 
     def test_get_existing_chunk(self, retrieval_svc: RetrievalService):
         details = retrieval_svc._get_chunk_details("chunk_1")
@@ -102,25 +111,407 @@ class TestChunkDetailLookup:
         details = retrieval_svc._get_chunk_details("nonexistent")
         assert details is None
 
+    def test_get_many_chunks_in_one_call(self, retrieval_svc: RetrievalService):
+        details = retrieval_svc._get_chunks_details(["chunk_3", "nonexistent", "chunk_1"])
+        assert set(details) == {"chunk_1", "chunk_3"}
+        assert details["chunk_3"]["document_name"] == "kpi_overview.md"
+
+    def test_get_many_chunks_empty(self, retrieval_svc: RetrievalService):
+        assert retrieval_svc._get_chunks_details([]) == {}
+
+
+class TestEmbeddingCache:
+    """Test the query-embedding LRU cache."""
+
+    @staticmethod
+    def _make_service(cache_size: int) -> RetrievalService:
+        client = MagicMock()
+        client.embeddings.create.side_effect = lambda input, **_: MagicMock(
+            data=[
+                MagicMock(index=i, embedding=[float(len(text)), 0.5])
+                for i, text in enumerate(input)
+            ]
+        )
+        return RetrievalService(
+            db_path=Path("unused.sqlite"),
+            embedding_client=client,
+            embedding_deployment="emb",
+            embedding_dimensions=2,
+            embedding_cache_size=cache_size,
+        )
+
+    def test_repeated_query_hits_cache(self):
+        svc = self._make_service(cache_size=8)
+
+        first = svc.embed_query("rotate api key")
+        first.append(99.0)  # callers get a copy, never the cached value
+        second = svc.embed_query("rotate api key")
+
+        assert second == [14.0, 0.5]
+        assert svc.embedding_client.embeddings.create.call_count == 1
+        assert (svc.embedding_cache_hits, svc.embedding_cache_misses) == (1, 1)
+
+    def test_least_recently_used_entry_evicted(self):
+        svc = self._make_service(cache_size=2)
+
+        svc.embed_query("a")
+        svc.embed_query("bb")
+        svc.embed_query("a")  # refresh "a"
+        svc.embed_query("ccc")  # evicts "bb"
+        svc.embed_query("a")
+        svc.embed_query("bb")
+
+        assert svc.embedding_client.embeddings.create.call_count == 4
+
+    def test_serialized_vector_cached_with_embedding(self):
+        svc = self._make_service(cache_size=8)
+
+        first = svc._embed("a")
+        second = svc._embed("a")
+
+        assert second.blob is first.blob  # packed once, reused on every hit
+        assert first.blob == serialize_float32([1.0, 0.5])
+
+    def test_dimension_mismatch_raises(self):
+        svc = self._make_service(cache_size=8)
+        svc.embedding_dimensions = 3
+
+        with pytest.raises(ValueError, match="expected 3"):
+            svc.embed_query("a")
+
+    def test_zero_size_disables_cache(self):
+        svc = self._make_service(cache_size=0)
+
+        svc.embed_query("same")
+        svc.embed_query("same")
+
+        assert svc.embedding_client.embeddings.create.call_count == 2
+
+
+class TestEmbeddingBatcher:
+    """Test that concurrent async embeddings are coalesced into one API call."""
+
+    async def test_concurrent_queries_share_one_call(self):
+        svc = TestEmbeddingCache._make_service(cache_size=8)
+        svc.embedding_batch_delay_ms = 50
+        svc.start_embedding_batcher()
+        try:
+            results = await asyncio.gather(
+                svc.embed_query_async("a"),
+                svc.embed_query_async("bb"),
+                svc.embed_query_async("a"),
+            )
+        finally:
+            await svc.stop_embedding_batcher()
+
+        assert results == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+        create = svc.embedding_client.embeddings.create
+        assert create.call_count == 1
+        assert create.call_args.kwargs["input"] == ["a", "bb"]
+        # Batched results feed the same LRU as embed_query
+        assert svc.embed_query("bb") == [2.0, 0.5]
+        assert create.call_count == 1
+
+    async def test_api_error_propagates_to_callers(self):
+        svc = TestEmbeddingCache._make_service(cache_size=8)
+        svc.embedding_client.embeddings.create.side_effect = RuntimeError("429")
+        svc.start_embedding_batcher()
+        try:
+            with pytest.raises(RuntimeError, match="429"):
+                await svc.embed_query_async("a")
+        finally:
+            await svc.stop_embedding_batcher()
+
+    async def test_batches_are_embedded_concurrently(self):
+        svc = TestEmbeddingCache._make_service(cache_size=0)
+        svc.embedding_batch_size = 1
+        create = svc.embedding_client.embeddings.create
+        both_in_flight = threading.Barrier(2, timeout=5)
+        embed = create.side_effect
+        create.side_effect = lambda **kwargs: (both_in_flight.wait(), embed(**kwargs))[1]
+        svc.start_embedding_batcher()
+        try:
+            # Each call blocks until the other one has started as well
+            results = await asyncio.gather(svc.embed_query_async("a"), svc.embed_query_async("bb"))
+        finally:
+            await svc.stop_embedding_batcher()
+
+        assert results == [[1.0, 0.5], [2.0, 0.5]]
+        assert create.call_count == 2
+
+    async def test_short_response_fails_unresolved_callers(self):
+        svc = TestEmbeddingCache._make_service(cache_size=8)
+        svc.embedding_batch_delay_ms = 50
+        svc.embedding_client.embeddings.create.side_effect = lambda **_: MagicMock(
+            data=[MagicMock(index=0, embedding=[1.0, 0.5])]
+        )
+        svc.start_embedding_batcher()
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    svc.embed_query_async("a"),
+                    svc.embed_query_async("bb"),
+                    return_exceptions=True,
+                ),
+                timeout=5,
+            )
+        finally:
+            await svc.stop_embedding_batcher()
+
+        assert isinstance(results[1], ValueError)
+
+    async def test_stop_fails_queued_queries(self):
+        svc = TestEmbeddingCache._make_service(cache_size=8)
+        svc._embed_queue = asyncio.Queue()  # queued, but no collector running
+        pending = asyncio.ensure_future(svc.embed_query_async("a"))
+        await asyncio.sleep(0)
+
+        await svc.stop_embedding_batcher()
+
+        with pytest.raises(RuntimeError, match="batcher stopped"):
+            await asyncio.wait_for(pending, timeout=5)
+
+    async def test_falls_back_without_batcher(self):
+        svc = TestEmbeddingCache._make_service(cache_size=0)
+        assert await svc.embed_query_async("abc") == [3.0, 0.5]
+
+
+class TestHybridSearch:
+    """Test the single-statement hybrid query against real vec0 + FTS5 tables."""
+
+    # chunk_id -> (embedding, category, FTS content)
+    CHUNKS = {
+        "chunk_1": ([1.0, 0.0, 0.0], "policies", "production access requires mfa"),
+        "chunk_2": ([0.9, 0.1, 0.0], "policies", "mfa was optional for staging"),
+        "chunk_3": ([0.0, 1.0, 0.0], "domain", "conversion rate kpi definition"),
+    }
+
+    @pytest.fixture()
+    def hybrid_svc(self, tmp_vector_db: Path, request: pytest.FixtureRequest):
+        vec_category = getattr(request, "param", True)  # False: index built before the column
+        conn = sqlite3.connect(str(tmp_vector_db))
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.execute(
+            "CREATE VIRTUAL TABLE vec_chunks USING vec0("
+            "chunk_id TEXT PRIMARY KEY, embedding FLOAT[3]"
+            + (", category TEXT)" if vec_category else ")")
+        )
+        conn.execute(
+            "CREATE VIRTUAL TABLE fts_chunks USING fts5("
+            "chunk_id UNINDEXED, document_name, category, section_header, content)"
+        )
+        for chunk_id, (embedding, category, content) in self.CHUNKS.items():
+            if vec_category:
+                conn.execute(
+                    "INSERT INTO vec_chunks (chunk_id, embedding, category) VALUES (?, ?, ?)",
+                    (chunk_id, serialize_float32(embedding), category),
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO vec_chunks (chunk_id, embedding) VALUES (?, ?)",
+                    (chunk_id, serialize_float32(embedding)),
+                )
+            conn.execute(
+                "INSERT INTO fts_chunks (chunk_id, category, content) VALUES (?, ?, ?)",
+                (chunk_id, category, content),
+            )
+        conn.commit()
+        conn.close()
+
+        svc = TestEmbeddingCache._make_service(cache_size=0)
+        svc.db_path = tmp_vector_db
+        svc.embedding_dimensions = 3
+        svc.pool_size = 2
+        svc.connect()
+        svc.embedding_client.embeddings.create.side_effect = lambda input, **_: MagicMock(
+            data=[MagicMock(index=i, embedding=[0.0, 1.0, 0.0]) for i in range(len(input))]
+        )
+        yield svc
+        svc.close()
+
+    @staticmethod
+    def _python_rrf(svc: RetrievalService, query: str, k: int) -> list[tuple[str, float]]:
+        """The pre-fusion pipeline: two queries + reciprocal_rank_fusion."""
+        with svc._borrow() as conn:
+            vector = conn.execute(
+                "SELECT chunk_id, distance FROM vec_chunks WHERE embedding MATCH ? AND k = 10 "
+                "ORDER BY distance",
+                (serialize_float32([0.0, 1.0, 0.0]),),
+            ).fetchall()
+            bm25 = conn.execute(
+                "SELECT chunk_id, bm25(fts_chunks) AS s FROM fts_chunks WHERE fts_chunks MATCH ? "
+                "ORDER BY s LIMIT 10",
+                (query,),
+            ).fetchall()
+        return RetrievalService.reciprocal_rank_fusion(
+            [tuple(row) for row in vector], [tuple(row) for row in bm25], k=k
+        )
+
+    async def test_matches_python_rrf(self, hybrid_svc: RetrievalService):
+        results = await hybrid_svc.search("mfa", final_limit=3, rrf_k=60)
+
+        expected = self._python_rrf(hybrid_svc, "mfa", k=60)
+        assert [r.chunk_id for r in results] == [chunk_id for chunk_id, _ in expected]
+        assert [r.score for r in results] == pytest.approx([score for _, score in expected])
+        assert results[0].chunk_id == "chunk_1"  # in both legs, outranks the vector top hit
+        assert results[0].chunk_metadata == {"version": "v2"}
+
+    async def test_category_filter(self, hybrid_svc: RetrievalService):
+        results = await hybrid_svc.search("mfa", category="domain")
+        assert [r.chunk_id for r in results] == ["chunk_3"]
+
+    async def test_category_filter_ranks_within_category(self, hybrid_svc: RetrievalService):
+        # The global vector top-1 is chunk_3 (domain); the index filter still
+        # yields the nearest policies chunk instead of an empty leg.
+        results = await hybrid_svc.search("mfa", category="policies", vector_limit=1)
+        assert [r.chunk_id for r in results] == ["chunk_2", "chunk_1"]
+        assert results[0].score == pytest.approx(1 / 61 + 1 / 62)
+
+    @pytest.mark.parametrize("category", ["Policies", " POLICIES ", "policy"])
+    async def test_category_spellings_filter_both_legs(
+        self, hybrid_svc: RetrievalService, category: str
+    ):
+        # Normalized before either leg runs, so the vector leg does not come
+        # back empty while FTS5's case-folded, stemmed match still hits.
+        results = await hybrid_svc.search("mfa", category=category, vector_limit=1)
+        assert [r.chunk_id for r in results] == ["chunk_2", "chunk_1"]
+        assert results[0].score == pytest.approx(1 / 61 + 1 / 62)
+
+    async def test_unknown_category_searches_everything(self, hybrid_svc: RetrievalService):
+        results = await hybrid_svc.search("mfa", category="faq")
+        unfiltered = await hybrid_svc.search("mfa")
+        assert [r.chunk_id for r in results] == [r.chunk_id for r in unfiltered]
+
+    @pytest.mark.parametrize("hybrid_svc", [False], indirect=True)
+    async def test_category_filter_without_vec_column(self, hybrid_svc: RetrievalService):
+        assert hybrid_svc._vec_category is False
+        results = await hybrid_svc.search("staging", category="policies", vector_limit=1)
+        assert [r.chunk_id for r in results] == ["chunk_2"]  # vector top-1 is filtered out
+
+    async def test_invalid_fts_syntax_falls_back_to_vector(self, hybrid_svc: RetrievalService):
+        results = await hybrid_svc.search('mfa "unbalanced', final_limit=2)
+        assert [r.chunk_id for r in results] == ["chunk_3", "chunk_2"]
+        assert [r.score for r in results] == pytest.approx([1 / 61, 1 / 62])
+
+    async def test_rerank_loads_details_for_winners_only(self, hybrid_svc: RetrievalService):
+        hybrid_svc.reranker_enabled = True
+        hybrid_svc.reranker_api_key = "key"
+        hybrid_svc.reranker_top_n = 2
+        hybrid_svc._reranker_client = MagicMock()
+        hybrid_svc._reranker_client.rerank.return_value = MagicMock(
+            results=[
+                MagicMock(index=2, relevance_score=0.9),
+                MagicMock(index=0, relevance_score=0.4),
+            ]
+        )
+        fetched: list[list[str]] = []
+        get_details = hybrid_svc._get_chunks_details
+        hybrid_svc._get_chunks_details = lambda ids: fetched.append(ids) or get_details(ids)
+
+        results = await hybrid_svc.search("mfa", final_limit=1)
+
+        pool = [chunk_id for chunk_id, _ in self._python_rrf(hybrid_svc, "mfa", k=60)]
+        documents = hybrid_svc._reranker_client.rerank.call_args.kwargs["documents"]
+        assert len(documents) == len(pool) == 3
+        assert [(r.chunk_id, r.score) for r in results] == [(pool[2], 0.9)]
+        assert results[0].generation_chunk == documents[2]
+        assert results[0].document_name  # full details loaded for the winner
+        assert fetched == [[pool[2]]]
+
+
+class TestConnectionPool:
+    """Test that each concurrent borrower gets its own configured connection."""
+
+    def test_borrowers_get_distinct_connections(self, tmp_vector_db: Path):
+        svc = TestEmbeddingCache._make_service(cache_size=0)
+        svc.db_path = tmp_vector_db
+        svc.pool_size = 2
+        svc.connect()
+
+        with svc._borrow() as first, svc._borrow() as second:
+            assert first is not second
+            assert first.execute("PRAGMA cache_size").fetchone()[0] == -65536
+            assert first.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+            assert second.execute("SELECT vec_version()").fetchone()[0]
+        assert svc._get_chunk_details("chunk_2")["document_name"] == "security_policy_v1.md"
+
+        svc.close()
+        with pytest.raises(RuntimeError, match="Not connected"):
+            svc._get_chunk_details("chunk_2")
+
+    def test_knowledge_db_is_left_untouched(self, tmp_vector_db: Path):
+        svc = TestEmbeddingCache._make_service(cache_size=0)
+        svc.db_path = tmp_vector_db
+        svc.pool_size = 1
+        svc.connect()
+
+        with svc._borrow() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                conn.execute("DELETE FROM document_chunks")
+        svc.close()
+
+        assert not tmp_vector_db.with_name(f"{tmp_vector_db.name}-wal").exists()
+
 
 class TestRerankerDisabled:
     """Test that the reranker is a no-op when disabled."""
 
-    def test_rerank_passthrough_when_disabled(self):
+    def test_no_rerank_pass_when_disabled(self):
         svc = RetrievalService.__new__(RetrievalService)
         svc.reranker_enabled = False
         svc.reranker_api_key = None
 
-        candidates = [
-            RetrievalResult(
-                chunk_id="c1",
-                document_name="d.md",
-                category="domain",
-                section_header=None,
-                generation_chunk="text",
-                last_updated=None,
-                score=0.9,
-            ),
-        ]
-        result = svc._rerank("test query", candidates)
-        assert result is candidates  # same object, untouched
+        assert not svc._reranking
+
+
+class TestRerankerClient:
+    """Test that the Cohere client is built once and reused across searches."""
+
+    def test_client_created_once(self, monkeypatch: pytest.MonkeyPatch):
+        cohere = MagicMock()
+        cohere.Client.return_value.rerank.return_value = MagicMock(
+            results=[MagicMock(index=1, relevance_score=0.8)]
+        )
+        monkeypatch.setitem(sys.modules, "cohere", cohere)
+        svc = RetrievalService(
+            db_path=Path("unused.sqlite"),
+            embedding_client=MagicMock(),
+            embedding_deployment="emb",
+            reranker_enabled=True,
+            reranker_api_key="key",
+        )
+
+        first = svc._rerank_documents("q1", ["text 0", "text 1"])
+        svc._rerank_documents("q2", ["text 0", "text 1"])
+
+        assert first == [(1, 0.8)]
+        cohere.Client.assert_called_once()
+        assert cohere.Client.return_value.rerank.call_count == 2
+
+    def test_failed_call_keeps_rrf_order(self, monkeypatch: pytest.MonkeyPatch):
+        cohere = MagicMock()
+        cohere.Client.return_value.rerank.side_effect = RuntimeError("timeout")
+        monkeypatch.setitem(sys.modules, "cohere", cohere)
+        svc = RetrievalService(
+            db_path=Path("unused.sqlite"),
+            embedding_client=MagicMock(),
+            embedding_deployment="emb",
+            reranker_enabled=True,
+            reranker_api_key="key",
+        )
+
+        assert svc._rerank_documents("q", ["text"]) is None
+
+    def test_missing_package_disables_reranking(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setitem(sys.modules, "cohere", None)  # import raises ImportError
+        svc = RetrievalService(
+            db_path=Path("unused.sqlite"),
+            embedding_client=MagicMock(),
+            embedding_deployment="emb",
+            reranker_enabled=True,
+            reranker_api_key="key",
+        )
+        assert svc._reranker_client is None
+        assert not svc._reranking
@@ -0,0 +1,63 @@
+"""Tests for SemanticCacheService — uses a real in-memory sqlite-vec index."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from services.semantic_cache_service import SemanticCacheService
+
+
+@pytest.fixture()
+def cache() -> SemanticCacheService:
+    """A small 3-dimensional cache that holds at most two entries."""
+    svc = SemanticCacheService(embedding_dimensions=3, similarity_threshold=0.9, max_entries=2)
+    svc.connect()
+    yield svc
+    svc.close()
+
+
+class TestLookup:
+    """Test similarity-based lookups."""
+
+    def test_empty_cache_misses(self, cache: SemanticCacheService):
+        assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+    def test_similar_question_hits(self, cache: SemanticCacheService):
+        cache.store([1.0, 0.0, 0.0], "MRR is owned by Finance.", [{"name": "t"}], [{"n": 1}])
+
+        hit = cache.lookup([0.99, 0.05, 0.0])
+
+        assert hit is not None
+        assert hit.answer == "MRR is owned by Finance."
+        assert hit.tool_calls == [{"name": "t"}]
+        assert hit.sources == [{"n": 1}]
+        assert hit.similarity > 0.9
+
+    def test_dissimilar_question_misses(self, cache: SemanticCacheService):
+        cache.store([1.0, 0.0, 0.0], "answer")
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+
+    def test_not_connected_raises(self):
+        with pytest.raises(RuntimeError, match="Not connected"):
+            SemanticCacheService(embedding_dimensions=3).lookup([1.0, 0.0, 0.0])
+
+
+class TestEviction:
+    """Test TTL expiry and size-based eviction."""
+
+    def test_expired_entries_are_dropped(self, cache: SemanticCacheService):
+        cache.store([1.0, 0.0, 0.0], "stale")
+
+        with patch("services.semantic_cache_service.time.monotonic", return_value=1e12):
+            assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+    def test_oldest_entry_evicted_beyond_max_entries(self, cache: SemanticCacheService):
+        cache.store([1.0, 0.0, 0.0], "first")
+        cache.store([0.0, 1.0, 0.0], "second")
+        cache.store([0.0, 0.0, 1.0], "third")
+
+        assert cache.lookup([1.0, 0.0, 0.0]) is None
+        assert cache.lookup([0.0, 1.0, 0.0]).answer == "second"
+        assert cache.lookup([0.0, 0.0, 1.0]).answer == "third"
@@ -0,0 +1,82 @@
+"""Tests for the pydantic-settings Settings class.
+
+Kept apart from test_api.py so running them never imports the FastAPI app.
+"""
+
+import pytest
+
+from config import Settings
+
+
+class TestSettings:
+    """Test the pydantic-settings Settings class."""
+
+    _BASE = {
+        "_env_file": None,
+        "azure_openai_api_key": "k",
+        "azure_openai_endpoint": "https://ep.openai.azure.com/",
+    }
+
+    def test_defaults(self):
+        s = Settings(**self._BASE)
+        assert s.azure_openai_chat_deployment == "gpt-4o-mini"
+        assert s.vector_search_limit == 10
+        assert s.rrf_k == 60
+        assert s.reranker_enabled is False
+
+    def test_auth_defaults(self):
+        s = Settings(**self._BASE)
+        assert s.auth_enabled is True
+        assert s.jwt_secret == "dev-secret-change-in-production!!"
+        assert s.jwt_expiry_hours == 24
+        assert s.open_registration is False
+
+    def test_observability_defaults(self):
+        s = Settings(**self._BASE)
+        assert s.observability == "off"
+        assert s.otel_service_name == "knowledge-assistant-backend"
+        assert s.otel_exporter_otlp_endpoint == "http://localhost:4318"
+        assert s.otel_console_exporter is False
+
+    def test_embedding_falls_back_to_chat(self):
+        s = Settings(**self._BASE, azure_openai_api_version="2025-01-01")
+        assert s.azure_openai_embedding_endpoint == "https://ep.openai.azure.com/"
+        assert s.azure_openai_embedding_api_version == "2025-01-01"
+        assert s.azure_openai_embedding_api_key == "k"
+
+    def test_embedding_override(self):
+        s = Settings(
+            **self._BASE,
+            azure_openai_embedding_endpoint="https://embed.openai.azure.com/",
+            azure_openai_embedding_api_key="embed-key",
+        )
+        assert s.azure_openai_embedding_endpoint == "https://embed.openai.azure.com/"
+        assert s.azure_openai_embedding_api_key == "embed-key"
+
+    @pytest.mark.parametrize(
+        ("overrides", "db_exists", "error", "match"),
+        [
+            ({"azure_openai_api_key": ""}, True, ValueError, "AZURE_OPENAI_API_KEY"),
+            ({}, False, FileNotFoundError, "Run the data pipeline"),
+            (
+                {"reranker_enabled": True, "reranker_api_key": None},
+                True,
+                ValueError,
+                "RERANKER_API_KEY",
+            ),
+        ],
+        ids=["missing_key", "missing_db", "reranker_enabled_no_key"],
+    )
+    def test_validate_runtime_rejects(self, tmp_path, overrides, db_exists, error, match):
+        db = tmp_path / "test.sqlite"
+        if db_exists:
+            db.touch()
+        s = Settings(**{**self._BASE, "db_path": db, **overrides})
+        with pytest.raises(error, match=match):
+            s.validate_runtime()
+
+    def test_validate_runtime_ok(self, tmp_path):
+        db = tmp_path / "test.sqlite"
+        db.touch()
+        s = Settings(**self._BASE, db_path=db)
+        s.validate_runtime()
@@ -1,5 +1,9 @@
 """Tests for the SQL service."""
 
+import sqlite3
+
+import pytest
+
 from services.sql_service import SQLService
 
 
@@ -24,6 +28,21 @@ class TestSQLServiceValidation:
         result = sql_service.execute_query("DELETE FROM kpi_catalog")
         assert "Error" in result
 
+    def test_select_check_is_case_insensitive(self, sql_service: SQLService):
+        assert "MRR" in sql_service.execute_query("  select kpi_name from kpi_catalog")
+        assert "Error" in sql_service.execute_query("SELECTED kpi_name FROM kpi_catalog")
+
+    def test_connection_is_read_only(self, sql_service: SQLService):
+        with sql_service._borrow() as conn, pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM kpi_catalog")
+        assert "MRR" in sql_service.execute_query("SELECT kpi_name FROM kpi_catalog")
+
+    def test_keywords_inside_select_are_allowed(self, sql_service: SQLService):
+        result = sql_service.execute_query(
+            "SELECT kpi_name FROM kpi_catalog WHERE definition LIKE '% update %'"
+        )
+        assert result == "No results found."
+
 
 class TestSQLServiceQueries:
     """Test valid SELECT queries."""
@@ -55,6 +74,26 @@ class TestSQLServiceQueries:
         assert "Bob Jones" in result
         assert "Finance" in result
 
+    def test_result_table_format(self, sql_service: SQLService):
+        result = sql_service.execute_query(
+            "SELECT kpi_name, owner_team, NULL AS note FROM kpi_catalog WHERE kpi_name = 'MRR'"
+        )
+        assert result == "kpi_name | owner_team | note\n--- | --- | ---\nMRR | Finance | "
+
+    def test_rows_capped_with_note(self, sql_service: SQLService):
+        sql_service.max_rows = 2
+        capped = sql_service.execute_query("SELECT name FROM directory ORDER BY name")
+        assert capped.splitlines()[2:4] == ["Alice Smith", "Bob Jones"]
+        assert "Carol Lee" not in capped
+        assert "first 2 rows" in capped
+
+        sql_service.max_rows = 3
+        assert "first 3 rows" not in sql_service.execute_query("SELECT name FROM directory")
+
+    def test_trailing_semicolon_is_dropped(self, sql_service: SQLService):
+        sql = "SELECT kpi_name FROM kpi_catalog WHERE kpi_name = 'NPS'"
+        assert sql_service.execute_query(sql + " ;\n") == sql_service.execute_query(sql)
+
     def test_no_results(self, sql_service: SQLService):
         result = sql_service.execute_query(
             "SELECT * FROM kpi_catalog WHERE kpi_name = 'nonexistent'"
@@ -66,6 +105,67 @@ class TestSQLServiceQueries:
         assert "SQL Error" in result
 
 
+class TestSQLServiceResultCache:
+    """Test the formatted-result LRU cache."""
+
+    def test_repeated_query_skips_sqlite(self, sql_service: SQLService, monkeypatch):
+        sql = "SELECT kpi_name FROM kpi_catalog ORDER BY kpi_name"
+        first = sql_service.execute_query(sql)
+        monkeypatch.setattr(sql_service, "_pool", None)  # borrowing would now raise
+
+        assert sql_service.execute_query(sql + ";") == first
+
+    def test_database_change_invalidates(self, sql_service: SQLService, tmp_db):
+        sql = "SELECT COUNT(*) AS n FROM kpi_catalog"
+        assert sql_service.execute_query(sql).endswith("\n3")
+
+        conn = sqlite3.connect(tmp_db)  # e.g. a data pipeline re-run
+        conn.execute(
+            "INSERT INTO kpi_catalog (kpi_name, definition) VALUES ('ARR', ?)", ("x" * 8192,)
+        )
+        conn.commit()
+        conn.close()
+
+        assert sql_service.execute_query(sql).endswith("\n4")
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT kpi_name FROM kpi_catalog WHERE julianday('now') - julianday(last_updated) < 30",
+            "SELECT date('now') AS today",
+            "SELECT CURRENT_TIMESTAMP AS ts",
+            "SELECT random() AS r",
+        ],
+    )
+    def test_time_dependent_query_is_not_cached(self, sql_service: SQLService, sql: str):
+        cached_sql = "SELECT COUNT(*) AS n FROM kpi_catalog"
+        sql_service.execute_query(cached_sql)
+
+        sql_service.execute_query(sql)
+        sql_service.execute_query(sql)
+
+        assert list(sql_service._result_cache) == [(sql_service.max_rows, cached_sql)]
+
+
+class TestSQLServicePool:
+    """Test the read-only connection pool."""
+
+    def test_concurrent_queries_use_separate_connections(self, tmp_db):
+        svc = SQLService(db_path=tmp_db, pool_size=2)
+        svc.connect()
+        with svc._borrow() as first:
+            # One connection is checked out; a query still gets the other one
+            assert "MRR" in svc.execute_query("SELECT kpi_name FROM kpi_catalog")
+            with svc._borrow() as second:
+                assert second is not first
+        svc.close()
+
+    def test_query_after_close_raises(self, sql_service: SQLService):
+        sql_service.close()
+        with pytest.raises(RuntimeError, match="Not connected"):
+            sql_service.execute_query("SELECT 1")
+
+
 class TestSQLServiceSchemas:
     """Test schema retrieval."""
 
@@ -75,3 +175,10 @@ class TestSQLServiceSchemas:
         assert "directory" in schemas
         assert "kpi_name" in schemas
         assert "email" in schemas
+
+    def test_schemas_are_one_shared_constant(self):
+        from agent import SYSTEM_PROMPT
+        from services.sql_service import TABLE_SCHEMAS
+
+        assert SQLService.get_schemas() is TABLE_SCHEMAS  # no per-call copy
+        assert TABLE_SCHEMAS in SYSTEM_PROMPT  # embedded once, at import